@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+
+# Microbenchmarks for the per-tick math of mouse-follow-server.py and a full synthetic tick
+# (synthetic cursor -> follow pipeline -> send policy -> UDP to a loopback sink), plus one packet through
+# each same-host transport and one tick sent to several targets.
+# Results are shown next to baseline.json, relative to a calibration loop timed in the same run, so a
+# faster or slower machine doesn't shift every benchmark. --check turns changes past --tolerance into a
+# failure, run with --save to store new baselines.
+
+import argparse
+import importlib.util
+import json
+import math
+import os
+import platform
+import random
+import socket
+import sys
+import tempfile
+import timeit
+import types
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+GRIDS = [(0, 0), (2, 2), (4, 4), (16, 16)]
+FANOUT_TARGETS = [1, 2, 4, 8]
+ZOOMS = [-1, 2, 4]
+
+def load_server():
+    path = os.path.join(ROOT_DIR, "mouse-follow-server.py")
+    spec = importlib.util.spec_from_file_location("mouse_follow_server", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def make_args(**overrides):
+    # The server defaults, only what the pipeline reads
+    args = dict(
+        factor=0.01, minstep=2.0, maxstep=75.0, padding=0.45, zoom=2,
+        rows=0, columns=0, regions=None, predict=0, jitter_cutoff=0, jitter_beta=0.05, motion="vector", delay=10,
+        heartbeat=0, wire="text"
+    )
+    args.update(overrides)
+    return types.SimpleNamespace(**args)
+
+def measure(fn, number, repeat):
+    # Best of several runs in ns per call, the minimum is the least noisy estimate
+    timer = timeit.Timer(fn)
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+def calibrate(number, repeat):
+    # Plain float math and calls, like the per-tick work; every result is also compared as a multiple of this
+    def work():
+        x = 0.0
+        for i in range(20):
+            x = x * 0.5 + math.hypot(i, x)
+        return x
+
+    return measure(work, number, repeat)
+
+def bench_math(server, results, number, repeat):
+    results["vector_transition"] = measure(
+        lambda: server.vector_transition(100.0, 200.0, 900.0, 500.0, 0.01, 2.0, 75.0), number, repeat)
+    results["hybrid_transition_vector"] = measure(
+        lambda: server.hybrid_transition_vector(100.0, 200.0, 900.0, 500.0, 0.01, 2.0, 75.0), number, repeat)
+
+    for profile in server.MOTION_PROFILES:
+        engine = server.MotionEngine(profile)
+        clock = [0.0]
+
+        def motion():
+            clock[0] += 0.01
+            engine.step(100.0, 200.0, 900.0, 500.0, clock[0], 0.01, 2.0, 75.0)
+
+        results[f"motion[{profile}]"] = measure(motion, number, repeat)
+
+    # A tick that stalled for 100ms is integrated in 10 substeps
+    engine = server.MotionEngine("vector")
+    clock = [0.0]
+
+    def catch_up():
+        clock[0] += 0.1
+        engine.step(100.0, 200.0, 900.0, 500.0, clock[0], 0.01, 2.0, 75.0)
+
+    results["motion_catch_up[100ms]"] = measure(catch_up, number, repeat)
+
+    predictor = server.Predictor(0.03)
+    clock = [0.0]
+
+    def predict():
+        clock[0] += 0.01
+        predictor.update(100.0 + clock[0] * 1500, 500.0, clock[0])
+
+    results["predictor_update"] = measure(predict, number, repeat)
+
+    jitter_filter = server.JitterFilter(1.0, 0.05)
+    clock = [0.0]
+
+    def filter_jitter():
+        clock[0] += 0.01
+        jitter_filter.update(100.0 + clock[0] * 1500, 500.0, clock[0])
+
+    results["jitter_filter_update"] = measure(filter_jitter, number, repeat)
+
+    for zoom in ZOOMS:
+        results[f"clamp_to_visible[zoom={zoom}]"] = measure(
+            lambda: server.clamp_to_visible(0, 0, 1920, 1080, 1800.0, 40.0, zoom), number, repeat)
+
+    for cols, rows in GRIDS:
+        if cols <= 0:
+            continue
+        cell = (0, 0)
+        results[f"get_snap_target_with_padding[{cols}x{rows}]"] = measure(
+            lambda: server.get_snap_target_with_padding(1000.0, 700.0, 1920, 1080, cols, rows, cell, 0.45), number, repeat)
+        regions = server.RegionMap.from_grid(1920, 1080, cols, rows, 0.45)
+        results[f"region_snap[{cols}x{rows}]"] = measure(lambda: regions.snap(1000.0, 700.0, 0), number, repeat)
+
+    # Hundreds of non-uniform regions, like a per-window layout
+    rng = random.Random(1)
+    rects = [(rng.uniform(0, 1800), rng.uniform(0, 1000), rng.uniform(20, 400), rng.uniform(20, 300)) for _ in range(300)]
+    custom = server.RegionMap(rects, [0.1] * len(rects))
+    results["region_snap[custom=300]"] = measure(lambda: custom.snap(1000.0, 700.0, 0), number, repeat)
+
+    # One cursor driving several slots, and the packet that carries all of them
+    layout = server.MonitorLayout(refresh_interval=0, reader=lambda: [(0, 0, 1920, 1080), (1920, 0, 1920, 1080)])
+    for count in (1, 2, 4):
+        batch = server.SlotBatch(make_args(columns=2, rows=2), [{"monitor": i % 2} for i in range(count)], layout, 960, 540)
+        clock = [0.0]
+
+        def slots_step(batch=batch, clock=clock):
+            clock[0] += 0.01
+            batch.step(1000.0, 700.0, clock[0])
+
+        results[f"slots_step[{count}]"] = measure(slots_step, number, repeat)
+
+    def encode_slots():
+        batch.frame.update()
+        batch.frame.encode_binary(1)
+
+    results[f"encode_slots[{count}]"] = measure(encode_slots, number, repeat)
+
+    x, y = 1234.56, 789.01
+    results["encode_text"] = measure(lambda: f"{int(x)} {int(y)}".encode(), number, repeat)
+    packet = server.WIRE_PACKET
+    results["encode_binary"] = measure(
+        lambda: packet.pack(server.WIRE_MAGIC, server.WIRE_VERSION, 0, 0, 0, 1, 0, x, y), number, repeat)
+
+    # --crop: the crop rectangle is computed and packed by the server instead of the lua script
+    results["crop_rect"] = measure(lambda: server.crop_rect(x, y, 1920, 1080, 1920, 1080, 2), number, repeat)
+    crop_frame = server.CropFrame()
+
+    def encode_crop():
+        crop_frame.update_crop(x, y, None, server.crop_rect(x, y, 1920, 1080, 1920, 1080, 2))
+        crop_frame.encode_binary(1)
+
+    results["encode_crop"] = measure(encode_crop, number, repeat)
+
+def bench_tick(server, results, number, repeat):
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    sink.setblocking(False)
+    port = sink.getsockname()[1]
+
+    def drain():
+        try:
+            while True:
+                sink.recv(64)
+        except BlockingIOError:
+            pass
+
+    try:
+        for cols, rows in GRIDS:
+            for zoom in ZOOMS:
+                args = make_args(rows=rows, columns=cols, zoom=zoom)
+                backend = server.SyntheticBackend(0, 0, 1920, 1080)
+                follower = server.Follower(args, 1920, 1080, 960.0, 540.0)
+                policy = server.SendPolicy(0.01, heartbeat=0)
+                transport = server.UdpTransport("127.0.0.1", port, wire="text")
+                clock = [0.0]
+
+                def tick():
+                    clock[0] += 0.01
+                    raw_x, raw_y = server.get_mouse_relative_to_monitor(backend, 0, 0, 1920, 1080)
+                    x, y = follower.step(raw_x, raw_y, clock[0])
+                    if policy.should_send(int(x), int(y), clock[0]):
+                        transport.send(x, y, clock[0])
+
+                results[f"tick[grid={cols}x{rows},zoom={zoom}]"] = measure(tick, number, repeat)
+                transport.close()
+                drain()
+
+        # One binary packet through each same-host transport, written and read back like the lua script does
+        frame = server.WireFrame(1234.5, 678.9)
+        udp = server.UdpTransport("127.0.0.1", port, wire="binary")
+
+        def udp_round_trip():
+            udp.send_frame(frame, 0.0)
+            sink.recv(64)
+
+        results["round_trip[udp]"] = measure(udp_round_trip, number, repeat)
+        udp.close()
+        drain()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            shm = server.ShmTransport(os.path.join(tmp, "bench.shm"))
+            start = server.SHM_HEADER.size
+
+            def shm_round_trip():
+                shm.send_frame(frame, 0.0)
+                shm.mm[start:start + server.WIRE_PACKET.size]
+
+            results["round_trip[shm]"] = measure(shm_round_trip, number, repeat)
+            shm.close()
+    finally:
+        sink.close()
+
+def make_sendmmsg(sock, addresses, packet):
+    # One sendmmsg call for every address (Linux only), to compare with the per-target sends of FanOut
+    import ctypes
+
+    class iovec(ctypes.Structure):
+        _fields_ = [("base", ctypes.c_void_p), ("len", ctypes.c_size_t)]
+
+    class msghdr(ctypes.Structure):
+        _fields_ = [("name", ctypes.c_void_p), ("namelen", ctypes.c_uint32), ("iov", ctypes.POINTER(iovec)),
+                    ("iovlen", ctypes.c_size_t), ("control", ctypes.c_void_p), ("controllen", ctypes.c_size_t),
+                    ("flags", ctypes.c_int)]
+
+    class mmsghdr(ctypes.Structure):
+        _fields_ = [("hdr", msghdr), ("len", ctypes.c_uint)]
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    data = ctypes.create_string_buffer(packet, len(packet))
+    iov = iovec(ctypes.cast(data, ctypes.c_void_p), len(packet))
+    names = [ctypes.create_string_buffer(socket.AF_INET.to_bytes(2, sys.byteorder) + port.to_bytes(2, "big")
+        + socket.inet_aton(host) + bytes(8), 16) for host, port in addresses]
+    messages = (mmsghdr * len(addresses))()
+    for message, name in zip(messages, names):
+        message.hdr.name = ctypes.cast(name, ctypes.c_void_p)
+        message.hdr.namelen = 16
+        message.hdr.iov = ctypes.pointer(iov)
+        message.hdr.iovlen = 1
+    fd = sock.fileno()
+    count = len(addresses)
+    keep = (data, iov, names)
+
+    def send():
+        if libc.sendmmsg(fd, messages, count, 0) != count:
+            raise OSError(ctypes.get_errno(), "sendmmsg")
+    send.keep = keep
+    return send
+
+def bench_fanout(server, results, number, repeat):
+    # Sending one tick to several targets: FanOut (one connected socket and send per target) against
+    # one unconnected socket with sendto per target, and one sendmmsg call for all of them
+    sinks = []
+    try:
+        for count in FANOUT_TARGETS:
+            while len(sinks) < count:
+                sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                sink.bind(("127.0.0.1", 0))
+                sink.setblocking(False)
+                sinks.append(sink)
+            addresses = [sink.getsockname() for sink in sinks[:count]]
+
+            def drain():
+                for sink in sinks:
+                    try:
+                        while True:
+                            sink.recv(64)
+                    except BlockingIOError:
+                        pass
+
+            fanout = server.FanOut([server.UdpTransport(host, port, wire="binary") for host, port in addresses])
+            clock = [0.0]
+
+            def fanout_send():
+                clock[0] += 0.01
+                fanout.send(1234.5, 678.9, clock[0])
+                if fanout.targets[0].seq % 64 == 0:
+                    drain()
+
+            results[f"fanout_send[{count}]"] = measure(fanout_send, number, repeat)
+            fanout.close()
+            drain()
+
+            shared = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            packet = bytes(server.WireFrame(1234.5, 678.9).encode_binary(1))
+            sent = [0]
+
+            def shared_sendto():
+                for address in addresses:
+                    shared.sendto(packet, address)
+                sent[0] += 1
+                if sent[0] % 64 == 0:
+                    drain()
+
+            results[f"shared_sendto[{count}]"] = measure(shared_sendto, number, repeat)
+            drain()
+
+            if platform.system() == "Linux":
+                send_all = make_sendmmsg(shared, addresses, packet)
+
+                def sendmmsg():
+                    send_all()
+                    sent[0] += 1
+                    if sent[0] % 64 == 0:
+                        drain()
+
+                results[f"sendmmsg[{count}]"] = measure(sendmmsg, number, repeat)
+                drain()
+            shared.close()
+    finally:
+        for sink in sinks:
+            sink.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the per-tick work of mouse-follow-server.py")
+    parser.add_argument("-n", "--number", type=int, default=20000, help="Calls per run (default: 20000)")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Runs per benchmark, the best is kept (default: 5)")
+    parser.add_argument("-t", "--tolerance", type=float, default=0.25,
+        help="Allowed slowdown against the baseline before it is flagged (default: 0.25 = 25%%)")
+    parser.add_argument("-c", "--check", action="store_true",
+        help="Exit with 1 when a benchmark is slower than the baseline by more than --tolerance (the baseline should come from the same machine)")
+    parser.add_argument("-b", "--baseline", type=str, default=BASELINE_PATH, help="Baseline file (default: benchmarks/baseline.json)")
+    parser.add_argument("-s", "--save", action="store_true", help="Store the results as the new baseline")
+    args = parser.parse_args()
+
+    server = load_server()
+    results = {}
+    calibration = calibrate(args.number, args.repeat)
+    bench_math(server, results, args.number, args.repeat)
+    bench_tick(server, results, max(args.number // 4, 1), args.repeat)
+    bench_fanout(server, results, max(args.number // 4, 1), args.repeat)
+    # Timed again at the end, a machine that only got busy or clocked up later is caught by either one
+    calibration = min(calibration, calibrate(args.number, args.repeat))
+
+    baseline = {}
+    base_calibration = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            data = json.load(f)
+        baseline = data.get("results", {})
+        base_calibration = data.get("calibration")
+    # Changes are compared in multiples of the calibration loop, older baselines without one in ns
+    scale = base_calibration / calibration if base_calibration else 1.0
+
+    regressions = 0
+    width = max(len(name) for name in results)
+    print(f"{"benchmark":<{width}}  {"ns/call":>10}  {"baseline":>10}  {"change":>8}")
+    for name, ns in results.items():
+        base = baseline.get(name)
+        if base:
+            change = ns * scale / base - 1
+            flag = "  REGRESSION" if change > args.tolerance else ""
+            regressions += bool(flag)
+            print(f"{name:<{width}}  {ns:>10.1f}  {base:>10.1f}  {change:>+7.1%}{flag}")
+        else:
+            print(f"{name:<{width}}  {ns:>10.1f}  {"-":>10}  {"new":>8}")
+
+    tick = results["tick[grid=0x0,zoom=2]"]
+    print(f"\nCalibration loop: {calibration:.1f}ns{f" (baseline {base_calibration:.1f}ns)" if base_calibration else ""}")
+    print(f"One core sustains about {1e9 / tick:,.0f} ticks/s (default settings)")
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({
+                "note": "Timings of one machine in ns per call, compared as multiples of the calibration loop; "
+                        "save a new baseline before using --check on another machine",
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "calibration": round(calibration, 1),
+                "results": {name: round(ns, 1) for name, ns in results.items()},
+            }, f, indent=2)
+        print(f"Baseline saved to:\n> {args.baseline}")
+    elif regressions:
+        print(f"{regressions} benchmark(s) are more than {args.tolerance:.0%} slower than the baseline")
+        if args.check:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+
+# End-to-end load test of mouse-follow-server.py without OBS or a display: the server runs with the
+# synthetic cursor and a fixed --geometry, sends to stand-in lua receivers (receiver.py) and talks to
+# an obs-websocket stub (obs_stub.py) while zoom hotkeys arrive on the control socket. Every
+# combination of --delays, --grids and --targets is run once and summarized in a markdown report.
+
+import argparse
+import itertools
+import os
+import platform
+import re
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from obs_stub import ObsStub
+from receiver import Receiver
+from startup import SERVER_PATH, isolated_env
+
+def free_udp_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+def stop_process(proc):
+    if platform.system() == "Windows":
+        proc.terminate()
+    else:
+        proc.send_signal(signal.SIGINT)
+    try:
+        return proc.communicate(timeout=10)[0]
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        return proc.communicate()[0]
+
+def parse_server_output(output):
+    # The summary the server prints on exit
+    result = {}
+    sent = re.findall(r" sent (\d+) packets as ", output)
+    if sent:
+        result["sent"] = sum(int(count) for count in sent)
+    match = re.search(r"Ticks: (\d+), overruns: (\d+) \((\d+) ticks merged\), jitter mean=([\d.]+)ms max=([\d.]+)ms", output)
+    if match:
+        result["ticks"], result["overruns"] = int(match.group(1)), int(match.group(2))
+        result["tick_jitter_ms"], result["tick_jitter_max_ms"] = float(match.group(4)), float(match.group(5))
+    return result
+
+def run_scenario(home, delay, grid, targets, args):
+    cols, rows = grid
+    receivers = [Receiver(poll=args.poll / 1000.0) for _ in range(targets)]
+    stub = ObsStub(delay=args.ws_delay / 1000.0, source_size=(1920, 1080))
+    control_port = free_udp_port()
+    for receiver in receivers:
+        receiver.start()
+    stub.start()
+
+    cmd = [
+        sys.executable, SERVER_PATH,
+        "--ip", "127.0.0.1",
+        "--port", *[str(receiver.port) for receiver in receivers],
+        "--input", "synthetic",
+        "--geometry", "1920x1080+0+0",
+        "--delay", str(delay),
+        "--columns", str(cols), "--rows", str(rows),
+        "--wsport", str(stub.port),
+        "--source-name", "Display",
+        "--control", str(control_port),
+        "--config-file", os.path.join(home, "loadtest_config.json"),
+    ]
+    proc = subprocess.Popen(cmd, env=isolated_env(home), stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT, text=True)
+
+    # Zoom hotkeys keep the WebSocket side busy while the stream is measured
+    control = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    end = time.monotonic() + args.duration
+    next_hotkey = time.monotonic() + args.hotkey_interval if args.hotkey_interval > 0 else end
+    while time.monotonic() < end and proc.poll() is None:
+        time.sleep(min(0.05, max(end - time.monotonic(), 0)))
+        if time.monotonic() >= next_hotkey:
+            next_hotkey += args.hotkey_interval
+            control.sendto(b"x", ("127.0.0.1", control_port))
+    control.close()
+
+    output = stop_process(proc)
+    time.sleep(args.poll / 1000.0 * 2)
+    for receiver in receivers:
+        receiver.stop()
+    stub.stop()
+
+    result = {"delay": delay, "grid": f"{cols}x{rows}", "targets": targets, "ws_delay": args.ws_delay}
+    result.update(parse_server_output(output))
+    reports = [receiver.report() for receiver in receivers]
+    result["received"] = sum(r["binary"] + r["text"] for r in reports)
+    result["lost"] = sum(r["lost"] for r in reports)
+    result["reordered"] = sum(r["reordered"] + r["duplicates"] for r in reports)
+    p50 = [r["latency_p50_ms"] for r in reports if r["latency_p50_ms"] is not None]
+    p99 = [r["latency_p99_ms"] for r in reports if r["latency_p99_ms"] is not None]
+    result["latency_p50_ms"] = max(p50) if p50 else None
+    result["latency_p99_ms"] = max(p99) if p99 else None
+    result["jitter_ms"] = max(r["jitter_ms"] for r in reports)
+    stub_report = stub.report()
+    result["ws_requests"] = sum(stub_report["requests"].values())
+    result["hotkeys"] = sum(stub_report["hotkeys"].values())
+    if proc.returncode not in (0, -signal.SIGINT) and "ticks" not in result:
+        result["error"] = output.strip().splitlines()[-1] if output.strip() else f"exit code {proc.returncode}"
+    return result
+
+COLUMNS = [
+    ("delay", "delay ms", "{}"),
+    ("grid", "grid", "{}"),
+    ("targets", "targets", "{}"),
+    ("ticks", "ticks", "{}"),
+    ("overruns", "overruns", "{}"),
+    ("tick_jitter_ms", "tick jitter ms", "{:.3f}"),
+    ("sent", "sent", "{}"),
+    ("received", "received", "{}"),
+    ("lost", "lost", "{}"),
+    ("reordered", "reordered", "{}"),
+    ("latency_p50_ms", "latency p50 ms", "{:.2f}"),
+    ("latency_p99_ms", "latency p99 ms", "{:.2f}"),
+    ("jitter_ms", "jitter ms", "{:.2f}"),
+    ("hotkeys", "hotkeys", "{}"),
+    ("ws_requests", "ws requests", "{}"),
+]
+
+def format_report(results, args):
+    lines = [
+        "# mouse-follow-server.py load test",
+        "",
+        f"{time.strftime("%Y-%m-%d %H:%M:%S")}, python {platform.python_version()}, {platform.system()} {platform.machine()}, "
+        f"{args.duration}s per run, receiver poll {args.poll}ms, WebSocket delay {args.ws_delay}ms, "
+        f"zoom hotkey every {args.hotkey_interval}s",
+        "",
+        "Latency is measured when the receiver poll picks a packet up, like the lua script sees it. "
+        "sent and received are summed over all targets.",
+        "",
+        "| " + " | ".join(title for _, title, _ in COLUMNS) + " |",
+        "|" + "|".join("---:" for _ in COLUMNS) + "|",
+    ]
+    for result in results:
+        cells = []
+        for key, _, fmt in COLUMNS:
+            value = result.get(key)
+            cells.append("-" if value is None else fmt.format(value))
+        lines.append("| " + " | ".join(cells) + " |")
+    errors = [result for result in results if "error" in result]
+    if errors:
+        lines += ["", "Errors:"]
+        lines += [f"* delay={r["delay"]} grid={r["grid"]} targets={r["targets"]}: {r["error"]}" for r in errors]
+    return "\n".join(lines) + "\n"
+
+def parse_grid(text):
+    cols, _, rows = text.partition("x")
+    return int(cols), int(rows or cols)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test mouse-follow-server.py against stand-in receivers and an obs-websocket stub")
+    parser.add_argument("--delays", type=int, nargs="+", default=[10, 4], help="Server tick delays in ms (default: 10 4)")
+    parser.add_argument("--grids", type=parse_grid, nargs="+", default=[(0, 0), (4, 4)],
+        help="Snap grids as COLSxROWS (default: 0x0 4x4)")
+    parser.add_argument("--targets", type=int, nargs="+", default=[1, 3], help="Receiver counts (default: 1 3)")
+    parser.add_argument("-t", "--duration", type=float, default=3.0, help="Seconds per run (default: 3)")
+    parser.add_argument("--poll", type=float, default=10, help="Receiver poll delay in ms like the lua script (default: 10)")
+    parser.add_argument("--ws-delay", type=float, default=50, help="Delay of every WebSocket answer in ms (default: 50)")
+    parser.add_argument("--hotkey-interval", type=float, default=0.5,
+        help="Send a zoom toggle every N seconds (default: 0.5; 0 to disable)")
+    parser.add_argument("-o", "--output", type=str, default="loadtest-report.md", help="Report file (default: loadtest-report.md)")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as home:
+        for delay, grid, targets in itertools.product(args.delays, args.grids, args.targets):
+            print(f"Running delay={delay}ms grid={grid[0]}x{grid[1]} targets={targets} ...", flush=True)
+            results.append(run_scenario(home, delay, grid, targets, args))
+
+    report = format_report(results, args)
+    with open(args.output, "w") as f:
+        f.write(report)
+    print()
+    print(report)
+    print(f"Report written to:\n> {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+
+# Minimal obs-websocket 5 server for load tests without OBS. Speaks just enough RFC 6455 and
+# obs-websocket (Hello, Identify, requests, events) for obsws_python, and answers the requests
+# mouse-follow-server.py sends: GetSourceFilter for the zoom-state, TriggerHotkeyByName for the
+# zoom hotkeys and GetVideoSettings for --fps -1. A hotkey changes the fake crop filter and sends SourceFilterSettingsChanged to
+# clients that subscribed to filter events. Every answer can be delayed to simulate a busy OBS.
+
+import argparse
+import base64
+import hashlib
+import json
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import Counter
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+CROP_FILTER_NAME = "obs-zoom-to-mouse-crop"
+EVENT_FILTERS = 1 << 5
+
+OP_HELLO = 0
+OP_IDENTIFY = 1
+OP_IDENTIFIED = 2
+OP_EVENT = 5
+OP_REQUEST = 6
+OP_REQUEST_RESPONSE = 7
+
+class WebSocket:
+    # Server side of one connection: unmasked frames out, masked frames in
+    def __init__(self, sock):
+        self.sock = sock
+        self.file = sock.makefile("rb")
+        self.lock = threading.Lock()
+
+    def handshake(self):
+        headers = {}
+        request_line = self.file.readline()
+        if not request_line.startswith(b"GET "):
+            return False
+        while True:
+            line = self.file.readline().decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        key = headers.get("sec-websocket-key")
+        if not key:
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        response = ["HTTP/1.1 101 Switching Protocols", "Upgrade: websocket", "Connection: Upgrade",
+            f"Sec-WebSocket-Accept: {accept}"]
+        protocols = [p.strip() for p in headers.get("sec-websocket-protocol", "").split(",")]
+        if "obswebsocket.json" in protocols:
+            response.append("Sec-WebSocket-Protocol: obswebsocket.json")
+        self.sock.sendall(("\r\n".join(response) + "\r\n\r\n").encode())
+        return True
+
+    def read_exact(self, size):
+        data = self.file.read(size)
+        if len(data) < size:
+            raise ConnectionError("connection closed")
+        return data
+
+    def recv(self):
+        # Returns the text of the next message, None once the client closed the connection
+        message = b""
+        while True:
+            first, second = self.read_exact(2)
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length = struct.unpack(">H", self.read_exact(2))[0]
+            elif length == 127:
+                length = struct.unpack(">Q", self.read_exact(8))[0]
+            mask = self.read_exact(4) if second & 0x80 else None
+            payload = self.read_exact(length)
+            if mask:
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+            if opcode == 0x8:
+                self.send_frame(0x8, payload[:2])
+                return None
+            if opcode == 0x9:
+                self.send_frame(0xA, payload)
+                continue
+            if opcode == 0xA:
+                continue
+            message += payload
+            if first & 0x80:
+                return message.decode()
+
+    def send_frame(self, opcode, payload):
+        header = bytes([0x80 | opcode])
+        if len(payload) < 126:
+            header += bytes([len(payload)])
+        elif len(payload) < 65536:
+            header += bytes([126]) + struct.pack(">H", len(payload))
+        else:
+            header += bytes([127]) + struct.pack(">Q", len(payload))
+        with self.lock:
+            self.sock.sendall(header + payload)
+
+    def send(self, message):
+        self.send_frame(0x1, json.dumps(message).encode())
+
+class ObsStub:
+    def __init__(self, host="127.0.0.1", port=0, delay=0.0, hotkey_delay=None, source_name="Display",
+                 source_size=(1920, 1080), zoom=2.0, fps=(60, 1)):
+        self.delay = delay
+        self.fps = fps
+        self.hotkey_delay = delay if hotkey_delay is None else hotkey_delay
+        self.source_name = source_name
+        self.source_w, self.source_h = source_size
+        self.zoom = zoom
+        self.zoomed = False
+        self.lock = threading.Lock()
+        self.requests = Counter()
+        self.hotkeys = Counter()
+        self.clients = []
+        self.connections = 0
+        self.events = 0
+
+        stub = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                stub.serve_client(self.request)
+
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler, bind_and_activate=False)
+        self.server.daemon_threads = True
+        self.server.allow_reuse_address = True
+        self.server.server_bind()
+        self.server.server_activate()
+        self.port = self.server.server_address[1]
+        self.thread = None
+
+    def crop(self):
+        w, h = self.source_w, self.source_h
+        if not self.zoomed:
+            return {"left": 0, "top": 0, "cx": w, "cy": h}
+        cx, cy = int(w / self.zoom), int(h / self.zoom)
+        return {"left": (w - cx) // 2, "top": (h - cy) // 2, "cx": cx, "cy": cy}
+
+    def serve_client(self, sock):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        ws = WebSocket(sock)
+        client = {"ws": ws, "subs": 0}
+        try:
+            if not ws.handshake():
+                return
+            ws.send({"op": OP_HELLO, "d": {"obsWebSocketVersion": "5.0.0-stub", "rpcVersion": 1}})
+            with self.lock:
+                self.connections += 1
+                self.clients.append(client)
+            while True:
+                text = ws.recv()
+                if text is None:
+                    break
+                message = json.loads(text)
+                if message.get("op") == OP_IDENTIFY:
+                    client["subs"] = message["d"].get("eventSubscriptions", 0)
+                    ws.send({"op": OP_IDENTIFIED, "d": {"negotiatedRpcVersion": 1}})
+                elif message.get("op") == OP_REQUEST:
+                    ws.send({"op": OP_REQUEST_RESPONSE, "d": self.handle_request(message["d"])})
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            with self.lock:
+                if client in self.clients:
+                    self.clients.remove(client)
+            sock.close()
+
+    def handle_request(self, request):
+        name = request.get("requestType")
+        data = request.get("requestData") or {}
+        with self.lock:
+            self.requests[name] += 1
+        response = {"requestType": name, "requestId": request.get("requestId"),
+            "requestStatus": {"result": True, "code": 100}}
+
+        if name == "GetSourceFilter":
+            time.sleep(self.delay)
+            # Events name the source the server asked about
+            self.source_name = data.get("sourceName", self.source_name)
+            if data.get("filterName") != CROP_FILTER_NAME:
+                response["requestStatus"] = {"result": False, "code": 600, "comment": "No filter was found"}
+            else:
+                response["responseData"] = {"filterEnabled": True, "filterIndex": 0, "filterKind": "crop_filter",
+                    "filterSettings": self.crop()}
+        elif name == "TriggerHotkeyByName":
+            time.sleep(self.hotkey_delay)
+            hotkey = data.get("hotkeyName")
+            self.hotkeys[hotkey] += 1
+            if hotkey in ("zoom_in_hotkey", "zoom_out_hotkey", "toggle_zoom_hotkey"):
+                self.zoomed = {"zoom_in_hotkey": True, "zoom_out_hotkey": False}.get(hotkey, not self.zoomed)
+                self.broadcast_filter_change()
+        elif name == "GetVideoSettings":
+            time.sleep(self.delay)
+            response["responseData"] = {"fpsNumerator": self.fps[0], "fpsDenominator": self.fps[1],
+                "baseWidth": self.source_w, "baseHeight": self.source_h,
+                "outputWidth": self.source_w, "outputHeight": self.source_h}
+        elif name == "GetVersion":
+            time.sleep(self.delay)
+            response["responseData"] = {"obsVersion": "30.0.0", "obsWebSocketVersion": "5.0.0-stub", "rpcVersion": 1}
+        else:
+            response["requestStatus"] = {"result": False, "code": 204, "comment": "Unknown request type"}
+        return response
+
+    def broadcast_filter_change(self):
+        event = {"op": OP_EVENT, "d": {"eventType": "SourceFilterSettingsChanged", "eventIntent": EVENT_FILTERS,
+            "eventData": {"sourceName": self.source_name, "filterName": CROP_FILTER_NAME, "filterSettings": self.crop()}}}
+        with self.lock:
+            clients = [client for client in self.clients if client["subs"] & EVENT_FILTERS]
+        for client in clients:
+            try:
+                client["ws"].send(event)
+                self.events += 1
+            except OSError:
+                pass
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="obs-stub", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def report(self):
+        return {"connections": self.connections, "requests": dict(self.requests), "hotkeys": dict(self.hotkeys),
+            "events": self.events, "zoomed": self.zoomed}
+
+def main():
+    parser = argparse.ArgumentParser(description="Minimal obs-websocket 5 server for load tests without OBS")
+    parser.add_argument("-w", "--wsport", type=int, default=4455, help="Port to listen on (default: 4455)")
+    parser.add_argument("--delay", type=float, default=0, help="Delay every answer by N ms (default: 0)")
+    parser.add_argument("--hotkey-delay", type=float, default=None, help="Delay hotkey answers by N ms instead (default: --delay)")
+    parser.add_argument("-B", "--source-size", nargs=2, type=int, metavar=("WIDTH", "HEIGHT"), default=[1920, 1080],
+        help="Size of the fake zoom source (default: 1920 1080)")
+    parser.add_argument("--fps", nargs=2, type=int, metavar=("NUMERATOR", "DENOMINATOR"), default=[60, 1],
+        help="Canvas frame rate of the fake OBS (default: 60 1)")
+    parser.add_argument("-S", "--source-name", type=str, default="Display", help="Name of the fake zoom source in events (default: Display)")
+    args = parser.parse_args()
+
+    hotkey_delay = None if args.hotkey_delay is None else args.hotkey_delay / 1000.0
+    stub = ObsStub(port=args.wsport, delay=args.delay / 1000.0, hotkey_delay=hotkey_delay,
+        source_name=args.source_name, source_size=args.source_size, fps=tuple(args.fps))
+    stub.start()
+    print(f"obs-websocket stub listening on ws://127.0.0.1:{stub.port}, press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    stub.stop()
+    print(json.dumps(stub.report(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+
+# Stand-in for the OBS lua receiver: the same drain loop and packet rules as on_socket_timer and
+# parse_socket_packet in obs-zoom-to-mouse.lua, plus the measurements the script only logs.
+# Latency is taken when a poll drains the packet (like the script sees it), jitter follows RFC 3550
+# on those poll times. Runs on its own (python receiver.py --port 12345) or inside loadtest.py.
+
+import argparse
+import select
+import socket
+import statistics
+import struct
+import threading
+import time
+
+WIRE_MAGIC = b"OZMR"
+WIRE_ACK_MAGIC = b"OZMA"
+WIRE_VERSION = 1
+WIRE_KIND_POSITION = 0
+WIRE_KIND_SLOTS = 1
+WIRE_KIND_CROP = 2
+WIRE_PACKET = struct.Struct("<4sBBHqIIff")
+WIRE_CROP_PACKET = struct.Struct("<4sBBHqIIffff")
+WIRE_SLOTS_HEADER = struct.Struct("<4sBBHqI")
+WIRE_ACK = struct.Struct("<4sBBHIf")
+WIRE_ACK_RECEIVED = 1
+WIRE_STALE_WINDOW = 1024
+WIRE_NO_MONITOR = 0xFFFFFFFF
+
+class Receiver:
+    def __init__(self, host="127.0.0.1", port=0, poll=0.01, slot=0):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self.port = self.sock.getsockname()[1]
+        self.poll = poll
+        self.slot = slot
+
+        # What the lua script keeps
+        self.seq = None
+        self.latency = None
+        self.received = 0
+        self.dropped = 0
+        self.ack_time = None
+        self.reply_address = None
+        self.newest = None
+
+        # Measurements
+        self.text = 0
+        self.invalid = 0
+        self.other_slot = 0
+        self.duplicates = 0
+        self.reordered = 0
+        self.polls = 0
+        self.busy_polls = 0
+        self.lost = 0
+        self.text_since_binary = 0
+        self.latencies = []
+        self.jitter = 0.0
+        self.last_transit = None
+
+        self.running = False
+        self.thread = None
+
+    def parse(self, data, now_us):
+        if len(data) >= WIRE_SLOTS_HEADER.size and data[:4] == WIRE_MAGIC:
+            _, version, kind, count, timestamp, seq = WIRE_SLOTS_HEADER.unpack_from(data)
+            if version != WIRE_VERSION or not (
+                    (kind == WIRE_KIND_POSITION and len(data) == WIRE_PACKET.size) or
+                    (kind == WIRE_KIND_SLOTS and len(data) == WIRE_SLOTS_HEADER.size + 12 * count) or
+                    (kind == WIRE_KIND_CROP and len(data) == WIRE_CROP_PACKET.size)):
+                self.invalid += 1
+                return None
+            self.received += 1
+
+            if self.seq is not None:
+                diff = (seq - self.seq) % 4294967296
+                if diff == 0:
+                    self.duplicates += 1
+                    self.dropped += 1
+                    return None
+                if diff >= 2147483648 and 4294967296 - diff < WIRE_STALE_WINDOW:
+                    # Counted as lost when the gap opened
+                    self.reordered += 1
+                    self.lost = max(self.lost - 1, 0)
+                    self.dropped += 1
+                    return None
+                # Text packets share the sequence until the server switched to binary
+                self.lost += max(diff - 1 - self.text_since_binary, 0)
+            self.text_since_binary = 0
+            self.seq = seq
+
+            latency = (now_us - timestamp) / 1000
+            self.latencies.append(latency)
+            self.latency = latency if self.latency is None else self.latency + (latency - self.latency) * 0.05
+
+            # RFC 3550 interarrival jitter, the clocks only need to run at the same rate
+            transit = now_us - timestamp
+            if self.last_transit is not None:
+                self.jitter += (abs(transit - self.last_transit) - self.jitter) / 16
+            self.last_transit = transit
+
+            if kind == WIRE_KIND_POSITION:
+                _, _, _, slot, _, _, monitor, x, y = WIRE_PACKET.unpack(data)
+                if slot != self.slot:
+                    self.other_slot += 1
+                    return {"binary": True}
+            elif kind == WIRE_KIND_CROP:
+                # The center of the crop is the position
+                _, _, _, _, _, _, monitor, left, top, w, h = WIRE_CROP_PACKET.unpack(data)
+                x, y = left + w / 2, top + h / 2
+            else:
+                if self.slot >= count:
+                    self.other_slot += 1
+                    return {"binary": True}
+                start = WIRE_SLOTS_HEADER.size
+                monitor = struct.unpack_from("<I", data, start + 4 * self.slot)[0]
+                x, y = struct.unpack_from("<ff", data, start + 4 * count + 8 * self.slot)
+            return {"x": x, "y": y, "monitor": None if monitor == WIRE_NO_MONITOR else monitor, "binary": True}
+
+        parts = data.split()
+        if len(parts) in (2, 3) and self.slot == 0:
+            try:
+                values = [int(part) for part in parts]
+            except ValueError:
+                self.invalid += 1
+                return None
+            self.text += 1
+            self.text_since_binary += 1
+            return {"x": values[0], "y": values[1], "monitor": values[2] if len(values) == 3 else None}
+        self.invalid += 1
+        return None
+
+    def drain(self):
+        # One on_socket_timer call: every queued packet is parsed, only the newest one is used
+        self.polls += 1
+        now_us = time.time_ns() // 1000
+        has_reply = False
+        busy = False
+        while True:
+            try:
+                data, address = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionResetError:
+                continue
+            busy = True
+            sample = self.parse(data, now_us)
+            if sample:
+                if "x" in sample:
+                    self.newest = sample
+                if sample.get("binary"):
+                    self.reply_address = address
+                    has_reply = True
+        if busy:
+            self.busy_polls += 1
+
+        if has_reply:
+            now = time.monotonic()
+            if self.ack_time is None or now - self.ack_time >= 1.0:
+                self.ack_time = now
+                self.send_ack()
+
+    def send_ack(self):
+        ack = WIRE_ACK.pack(WIRE_ACK_MAGIC, WIRE_VERSION, WIRE_ACK_RECEIVED, self.received % 65536,
+            self.seq or 0, self.latency if self.latency is not None else -1)
+        try:
+            self.sock.sendto(ack, self.reply_address)
+        except OSError:
+            pass
+
+    def run(self, duration=None):
+        # poll > 0 sleeps like the obs timer, 0 drains as soon as a packet is readable
+        end = None if duration is None else time.monotonic() + duration
+        next_poll = time.monotonic()
+        while self.running and (end is None or time.monotonic() < end):
+            if self.poll > 0:
+                next_poll += self.poll
+                delay = next_poll - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_poll = time.monotonic()
+            else:
+                select.select([self.sock], [], [], 0.1)
+            self.drain()
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name=f"receiver-{self.port}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(1)
+        self.sock.close()
+
+    def report(self):
+        latencies = sorted(self.latencies)
+        quantile = lambda q: latencies[min(int(q * len(latencies)), len(latencies) - 1)] if latencies else None
+        return {
+            "port": self.port,
+            "binary": self.received,
+            "text": self.text,
+            "invalid": self.invalid,
+            "other_slot": self.other_slot,
+            "lost": self.lost,
+            "reordered": self.reordered,
+            "duplicates": self.duplicates,
+            "latency_p50_ms": quantile(0.5),
+            "latency_p99_ms": quantile(0.99),
+            "latency_mean_ms": statistics.fmean(latencies) if latencies else None,
+            "jitter_ms": self.jitter / 1000,
+            "polls": self.polls,
+            "busy_polls": self.busy_polls,
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Receive mouse-follow-server.py packets like the lua script and measure them")
+    parser.add_argument("-p", "--port", type=int, default=12345, help="UDP port (default: 12345)")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--poll", type=float, default=10, help="Poll delay in ms like the lua script, 0 to read packets right away (default: 10)")
+    parser.add_argument("--slot", type=int, default=0, help="Slot to follow (default: 0)")
+    parser.add_argument("-t", "--duration", type=float, default=None, help="Stop after N seconds (default: until Ctrl+C)")
+    args = parser.parse_args()
+
+    receiver = Receiver(args.host, args.port, poll=args.poll / 1000.0, slot=args.slot)
+    receiver.running = True
+    print(f"Listening on {args.host}:{receiver.port}, press Ctrl+C to stop")
+    try:
+        receiver.run(args.duration)
+    except KeyboardInterrupt:
+        pass
+    receiver.stop()
+    for name, value in receiver.report().items():
+        print(f"{name:<16} {value if not isinstance(value, float) else round(value, 3)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+# Startup benchmark for mouse-follow-server.py: module import time, --help, and the time from
+# starting the server until the first UDP packet arrives at a loopback sink (synthetic cursor input,
+# OBS WebSocket connecting in the background). Every measurement starts a fresh interpreter.
+
+import argparse
+import os
+import platform
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+SERVER_PATH = os.path.join(ROOT_DIR, "mouse-follow-server.py")
+
+IMPORT_CODE = f"""
+import importlib.util, time
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("mouse_follow_server", {SERVER_PATH!r})
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+print(time.perf_counter() - start)
+"""
+
+def isolated_env(home):
+    # Keep the benchmark away from the real config dir
+    env = dict(os.environ)
+    env["HOME"] = home
+    env["APPDATA"] = home
+    return env
+
+def time_process(cmd, env):
+    start = time.perf_counter()
+    subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    return time.perf_counter() - start
+
+def time_import(env):
+    out = subprocess.run([sys.executable, "-c", IMPORT_CODE], env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def time_first_packet(env, home, wsport, timeout):
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    sink.settimeout(timeout)
+    port = sink.getsockname()[1]
+    cmd = [
+        sys.executable, SERVER_PATH,
+        "--ip", "127.0.0.1", "--port", str(port),
+        "--input", "synthetic",
+        # A fixed monitor, so headless machines without screeninfo start too
+        "--geometry", "1920x1080+0+0",
+        "--wsport", str(wsport),
+        "--config-file", os.path.join(home, "startup_config.json"),
+    ]
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        sink.recv(64)
+        return time.perf_counter() - start
+    except socket.timeout:
+        return None
+    finally:
+        if platform.system() == "Windows":
+            proc.terminate()
+        else:
+            proc.send_signal(signal.SIGINT)
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        sink.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the startup of mouse-follow-server.py")
+    parser.add_argument("-r", "--runs", type=int, default=5, help="Runs per measurement, the median is shown (default: 5)")
+    parser.add_argument("-w", "--wsport", type=int, default=4455,
+        help="OBS WebSocket port the server tries in the background (default: 4455)")
+    parser.add_argument("-t", "--timeout", type=float, default=10.0, help="Seconds to wait for the first packet (default: 10)")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as home:
+        env = isolated_env(home)
+        results["python startup"] = [time_process([sys.executable, "-c", "pass"], env) for _ in range(args.runs)]
+        results["module import"] = [time_import(env) for _ in range(args.runs)]
+        results["--help"] = [time_process([sys.executable, SERVER_PATH, "--help"], env) for _ in range(args.runs)]
+        first = [time_first_packet(env, home, args.wsport, args.timeout) for _ in range(args.runs)]
+        if None in first:
+            print("The server did not send a packet in time, is screeninfo installed?")
+            sys.exit(1)
+        results["first packet"] = first
+
+    width = max(len(name) for name in results)
+    print(f"{"measurement":<{width}}  {"median ms":>10}  {"min ms":>10}")
+    for name, times in results.items():
+        print(f"{name:<{width}}  {statistics.median(times) * 1000:>10.1f}  {min(times) * 1000:>10.1f}")
+
+if __name__ == "__main__":
+    main()
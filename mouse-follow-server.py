@@ -4,13 +4,22 @@ import socket
 import time
 import os
 import argparse
-import pyautogui
 import math
 import platform
 import sys
 import select
 import json
-from screeninfo import get_monitors
+import threading
+import struct
+import ctypes
+import mmap
+import bisect
+import re
+from array import array
+from collections import deque
+
+# Heavy or optional modules (screeninfo, pyautogui, obsws_python, Xlib) are imported where they are used,
+# so --help, argument errors and --listmonitors start fast
 
 def get_config_dir():
     if platform.system() == "Windows":
@@ -20,18 +29,13 @@ def get_config_dir():
     else:
         base_dir = os.path.expanduser("~/.config")
 
-    config_dir = os.path.join(base_dir, "obs_zoommouse_socket")
-    os.makedirs(config_dir, exist_ok=True)
-    return config_dir
+    return os.path.join(base_dir, "obs_zoommouse_socket")
 
+# Only created once something is written there
 CONFIG_DIR = get_config_dir()
 
-# Optional OBS WebSocket hotkey toggle
-try:
-    import obsws_python as obs
-    OBS_AVAILABLE = True
-except ImportError:
-    OBS_AVAILABLE = False
+def ensure_config_dir():
+    os.makedirs(CONFIG_DIR, exist_ok=True)
 
 # Platform-specific imports
 if platform.system() == "Windows":
@@ -57,16 +61,43 @@ def save_last_config(args, last_config, Ignore=[], CONFIG_PATH=os.path.join(CONF
             del conf[c]
     try:
         if last_config != conf:
+            os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
             with open(CONFIG_PATH, "w") as f:
                 json.dump(conf, f, indent=2)
             print(f"Last cli args where saved to:\n> {CONFIG_PATH}")
     except Exception as e:
         print(f"Warning: Failed to save config: {e}")
 
+def resolve_config_path(path):
+    if os.path.isabs(path):
+        return os.path.abspath(path)
+    ensure_config_dir()
+    return os.path.join(CONFIG_DIR, path)
+
 def list_monitors():
+    from screeninfo import get_monitors
     for idx, m in enumerate(get_monitors()):
         print(f"[{idx}] x={m.x} y={m.y} width={m.width} height={m.height}")
 
+def parse_geometry(text):
+    # WIDTHxHEIGHT+X+Y like X11 geometry strings, the offset may be left out or negative (1920x1080-1920+0)
+    match = re.fullmatch(r"(\d+)x(\d+)(?:\+?(-?\d+)\+?(-?\d+))?", text.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT+X+Y, got {text!r}")
+    w, h, x, y = match.groups()
+    return (int(x or 0), int(y or 0), int(w), int(h))
+
+def parse_fps(text):
+    # 60, 59.94 or the exact ratio OBS uses (60000/1001)
+    num, _, den = text.strip().partition("/")
+    try:
+        fps = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        raise argparse.ArgumentTypeError(f"expected a frame rate like 60 or 60000/1001, got {text!r}")
+    if fps < 0 and fps != -1:
+        raise argparse.ArgumentTypeError(f"the frame rate can't be negative (except -1), got {text!r}")
+    return fps
+
 def str2bool(v):
     if isinstance(v, bool):
         return v
@@ -90,19 +121,41 @@ def parse_arguments():
     parser.add_argument("-c", "--config-file", type=str, default=config_file,
         help=f"Set the config file location (default; not stored: {default_config_file})")
 
-    parser.add_argument("-i", "--ip", type=str, default=last_config.get("ip", "localhost"), help="OBS hostname or IP (default: localhost)")
-    parser.add_argument("-p", "--port", type=int, default=last_config.get("port", 12345), help="UDP port (default: 12345)")
-    parser.add_argument("-d", "--delay", type=int, default=last_config.get("delay", 10), help="Delay in ms (default: 10)")
+    parser.add_argument("-i", "--ip", type=str, nargs="+", default=last_config.get("ip", "localhost"),
+        help="OBS hostnames or IPs, every position is sent to each of them (default: localhost)")
+    parser.add_argument("-p", "--port", type=int, nargs="+", default=last_config.get("port", 12345),
+        help="UDP port, or one port per --ip (default: 12345)")
+    parser.add_argument("--shm", type=str, default=last_config.get("shm", ""),
+        help="Also write every position to this shared memory file, read by an OBS script on the same machine without a socket (relative to the config dir; default: off)")
+    parser.add_argument("--rate", type=float, nargs="+", default=last_config.get("rate", 0),
+        help="Max packets per second, or one limit per target (default: 0; no limit)")
+    parser.add_argument("-d", "--delay", type=int, default=last_config.get("delay", 10), help="Delay in ms between tick starts (default: 10)")
+    parser.add_argument("--fps", type=parse_fps, default=last_config.get("fps", 0),
+        help="Tick in step with the OBS frames instead of every --delay ms: the canvas frame rate (60 or 60000/1001), -1 to read it from OBS (default: 0; off)")
+    parser.add_argument("--fps-multiple", type=int, default=last_config.get("fps_multiple", 1),
+        help="Ticks per frame with --fps (default: 1)")
+    parser.add_argument("--fps-phase", type=float, default=last_config.get("fps_phase", 0.0),
+        help="Shift the --fps ticks by N ms on the monotonic clock grid, tuned by hand (default: 0)")
     parser.add_argument("-R", "--rows", type=int, default=last_config.get("rows", 0), help="Divide screen into N rows")
     parser.add_argument("-C", "--columns", type=int, default=last_config.get("columns", 0), help="Divide screen into N columns")
+    parser.add_argument("--regions", type=str, default=last_config.get("regions", None),
+        help="JSON file with custom snap regions, used instead of --rows and --columns (relative to the config dir)")
+    parser.add_argument("--slots", type=str, default=last_config.get("slots", None),
+        help="JSON file with several follow slots (monitor, grid, zoom and smoothing per slot), all sent in one packet (relative to the config dir)")
     parser.add_argument("-l", "--listmonitors", action="store_true", help="List available monitors")
-    parser.add_argument("-s", "--setmonitor", type=int, default=last_config.get("setmonitor", 0), help="Select monitor index to use")
+    parser.add_argument("-s", "--setmonitor", type=int, default=last_config.get("setmonitor", 0), help="Select monitor index to use (-1 to follow the cursor across monitors)")
+    parser.add_argument("--monitor-refresh", type=float, default=last_config.get("monitor_refresh", 2.0),
+        help="Check for monitor layout changes every N seconds (default: 2.0; 0 to disable)")
+    parser.add_argument("--geometry", type=parse_geometry, nargs="+", default=None, metavar="WxH+X+Y",
+        help="Monitor geometry, one per monitor, instead of asking the display server (for headless test runs; not stored)")
     parser.add_argument("-z", "--zoomin", type=str2bool, default=False, nargs='?', const=True,
         help="Zoom in at start (default: false; set to true to zoom in at start)")
     parser.add_argument("-t", "--zoomtoggle", type=str2bool, default=False, nargs='?', const=True,
         help="Use older zoomtoggle behavior (default: false; set to true to enable)")
     parser.add_argument("-P", "--padding", type=float, default=last_config.get("padding", 0.45),
         help="Sticky border padding as a percentage (default: 0.45)")
+    parser.add_argument("--motion", type=str, choices=MOTION_PROFILES, default=last_config.get("motion", "vector"),
+        help="Smoothing profile, factor/minstep/maxstep are per 10ms whatever the delay (default: vector)")
     parser.add_argument("-f", "--factor", type=float, default=last_config.get("factor", 0.01), help="Smoothing factor (default: 0.01)")
     parser.add_argument("-m", "--minstep", type=float, default=last_config.get("minstep", 2.0), help="Minimum step size (default: 2.0)")
     parser.add_argument("-M", "--maxstep", type=float, default=last_config.get("maxstep", 75.0), help="Maximum step size (default: 75.0)")
@@ -111,10 +164,46 @@ def parse_arguments():
     parser.add_argument("-w", "--wsport", type=int, default=last_config.get("wsport", 4455), help="OBS WebSocket port (default: 4455)")
     parser.add_argument("-W", "--wspassword", type=str, default=last_config.get("wspassword", ""), help="OBS WebSocket password (if set)")
     parser.add_argument("-k", "--keyfile", type=str, default=last_config.get("keyfile", ""), help="Path to a key input file (for automation)")
+    parser.add_argument("--control", type=str, default=last_config.get("control", ""),
+        help="Unix datagram socket path (or a localhost UDP port number) that accepts control commands (for automation)")
     parser.add_argument("-B", "--source-size", nargs=2, type=int, metavar=('WIDTH', 'HEIGHT'), default=last_config.get("source_size",[-1, -1]),
         help="Set obs source base size in pixels (default: Monitor Size; noted by xy; -1, -1)")
     parser.add_argument("-S", "--source-name", type=str, default=last_config.get("source_name"),
         help="Set obs source name; needed for zoom check.")
+    parser.add_argument("--heartbeat", type=int, default=last_config.get("heartbeat", 500),
+        help="While the position is unchanged only resend it every N ms (default: 500; 0 to send every tick)")
+    parser.add_argument("--fast-delay", type=int, default=last_config.get("fast_delay", -1),
+        help="Delay in ms used while the zoom position moves fast (default: -1; off; try 4)")
+    parser.add_argument("--fast-speed", type=float, default=last_config.get("fast_speed", 20.0),
+        help="Speed of the zoom position in pixels per 10ms that counts as fast motion (default: 20.0)")
+    parser.add_argument("--predict", type=float, default=last_config.get("predict", 0.0),
+        help="Extrapolate the cursor N ms ahead to hide the latency to OBS (default: 0; off; -1 to use the measured latency)")
+    parser.add_argument("--jitter-cutoff", type=float, default=last_config.get("jitter_cutoff", 0.0),
+        help="Filter hand jitter from the cursor before snapping: the cutoff in Hz while it rests, lower is smoother (default: 0; off; try 1)")
+    parser.add_argument("--jitter-beta", type=float, default=last_config.get("jitter_beta", 0.05),
+        help="How much the --jitter-cutoff rises per pixel per second of cursor speed, higher lags less on fast moves (default: 0.05)")
+    parser.add_argument("--spin", type=float, default=last_config.get("spin", 0.0),
+        help="Busy-wait the last N ms before each tick for sub-millisecond accuracy (default: 0; costs cpu)")
+    parser.add_argument("--wire", type=str, choices=["auto", "text", "binary"], default=last_config.get("wire", "auto"),
+        help="Packet format (default: auto; binary once the lua script acknowledges it, text otherwise)")
+    parser.add_argument("--crop", type=str2bool, default=last_config.get("crop", False), nargs='?', const=True,
+        help="Send the finished crop of the zoom source (from --zoom and --source-size) instead of a position, the lua script applies it as it is (default: false)")
+    parser.add_argument("--stats", type=str2bool, default=last_config.get("stats", False), nargs='?', const=True,
+        help="Collect tick, mouse, send and WebSocket latency stats; press [s] for a summary (default: false)")
+    parser.add_argument("--stats-interval", type=float, default=last_config.get("stats_interval", 0),
+        help="Print a stats summary every N seconds (default: 0; disabled; enables --stats)")
+    parser.add_argument("--stats-port", type=int, default=last_config.get("stats_port", 0),
+        help="Serve the stats in Prometheus text format on http://127.0.0.1:PORT/metrics (default: 0; disabled; enables --stats)")
+    parser.add_argument("--record", type=str, default=None,
+        help="Record the raw cursor samples to a trace file (not stored)")
+    parser.add_argument("--replay", type=str, default=None,
+        help="Feed a recorded trace file through the pipeline instead of the live cursor (not stored)")
+    parser.add_argument("--replay-speed", type=float, default=0.0,
+        help="Replay speed, 1 for real time (default: 0; as fast as possible; not stored)")
+    parser.add_argument("--replay-output", type=str, default=None,
+        help="Write the smoothed output of a replay to this trace file (not stored)")
+    parser.add_argument("--input", type=str, choices=INPUT_BACKENDS, default=last_config.get("input", "auto"),
+        help="Cursor input backend (default: auto; xinput on Linux/X11, pyautogui otherwise)")
 
     args = parser.parse_args()
 
@@ -123,11 +212,31 @@ def parse_arguments():
         exit(0)
 
     if args.delay < 0:
-        print("Delay can be below 0; Setting to 0")
-        args.delay == 0
+        print("Delay can't be below 0; Setting to 0")
+        args.delay = 0
+
+    if args.fps_multiple < 1:
+        print("The fps multiple can't be below 1; Setting to 1")
+        args.fps_multiple = 1
+
+    # Older configs store a single target
+    targets = 1
+    for name in ("ip", "port", "rate"):
+        values = getattr(args, name)
+        if not isinstance(values, list):
+            values = [values]
+            setattr(args, name, values)
+        if len(values) > 1:
+            if targets > 1 and len(values) != targets:
+                parser.error(f"--{name} needs 1 or {targets} values, got {len(values)}")
+            targets = len(values)
+
+    # A trace stores one monitor, a replay can't follow the cursor onto another one
+    if args.record and args.setmonitor < 0:
+        parser.error("--record needs a fixed --setmonitor, a trace only stores one monitor")
 
     # Save args for reuse in next run
-    save_last_config(args, last_config_copy, Ignore=["listmonitors","config_file"])
+    save_last_config(args, last_config_copy, Ignore=["listmonitors","config_file","record","replay","replay_speed","replay_output","geometry"])
 
     return args
 
@@ -209,6 +318,85 @@ def vector_transition(current_x, current_y,
 
     return new_x, new_y
 
+def spring_transition(current_x, current_y, velocity_x, velocity_y, target_x, target_y, omega, dt, max_speed):
+    # Exact step of a critically damped spring, it never overshoots a target that holds still
+    decay = math.exp(-omega * dt)
+    offset_x = current_x - target_x
+    offset_y = current_y - target_y
+    temp_x = (velocity_x + omega * offset_x) * dt
+    temp_y = (velocity_y + omega * offset_y) * dt
+    velocity_x = (velocity_x - omega * temp_x) * decay
+    velocity_y = (velocity_y - omega * temp_y) * decay
+    new_x = target_x + (offset_x + temp_x) * decay
+    new_y = target_y + (offset_y + temp_y) * decay
+
+    # Clamp the speed like max_step does for the other profiles
+    move = math.hypot(new_x - current_x, new_y - current_y)
+    if move > max_speed * dt:
+        scale = max_speed * dt / move
+        new_x = current_x + (new_x - current_x) * scale
+        new_y = current_y + (new_y - current_y) * scale
+        velocity_x *= scale
+        velocity_y *= scale
+
+    return new_x, new_y, velocity_x, velocity_y
+
+# factor, minstep and maxstep are tuned per 10ms, the historic default tick
+MOTION_REFERENCE = 0.01
+MOTION_MAX_CATCHUP = 0.5
+MOTION_PROFILES = ["vector", "hybrid", "spring"]
+
+class MotionEngine:
+    # Moves the zoom position towards the target over the real elapsed time, so the follow speed does
+    # not depend on --delay. The step settings are rescaled from the reference tick, and a stalled tick
+    # is integrated in reference sized substeps so it catches up as if it had not stalled.
+    def __init__(self, profile="vector"):
+        self.profile = profile
+        self.last = None
+        self.velocity_x = 0.0
+        self.velocity_y = 0.0
+
+    def reset(self):
+        self.last = None
+        self.velocity_x = 0.0
+        self.velocity_y = 0.0
+
+    def step(self, x, y, target_x, target_y, now, factor, min_step, max_step):
+        if now is None or self.last is None:
+            dt = MOTION_REFERENCE
+        else:
+            dt = min(now - self.last, MOTION_MAX_CATCHUP)
+        if now is not None:
+            self.last = now
+        if dt <= 0:
+            return x, y
+
+        substeps = max(round(dt / MOTION_REFERENCE), 1)
+        h = dt / substeps
+        scale = h / MOTION_REFERENCE
+        keep = max(1.0 - factor, 0.0)
+
+        if self.profile == "spring":
+            if keep <= 0:
+                self.velocity_x = self.velocity_y = 0.0
+                return target_x, target_y
+            # Same time constant as the exponential approach of the factor
+            omega = -math.log(keep) / MOTION_REFERENCE
+            vx, vy = self.velocity_x, self.velocity_y
+            for _ in range(substeps):
+                x, y, vx, vy = spring_transition(x, y, vx, vy, target_x, target_y, omega, h, max_step / MOTION_REFERENCE)
+            # Settle instead of creeping the last pixels
+            if math.hypot(target_x - x, target_y - y) <= min_step * scale and math.hypot(vx, vy) * h <= min_step * scale:
+                x, y, vx, vy = target_x, target_y, 0.0, 0.0
+            self.velocity_x, self.velocity_y = vx, vy
+            return x, y
+
+        rate = 1.0 - keep ** scale
+        transition = hybrid_transition_vector if self.profile == "hybrid" else vector_transition
+        for _ in range(substeps):
+            x, y = transition(x, y, target_x, target_y, rate, min_step * scale, max_step * scale)
+        return x, y
+
 def clamp_to_visible(monitor_x, monitor_y, monitor_w, monitor_h, target_x, target_y, zoom):
     if zoom < 0:
         return target_x, target_y
@@ -230,21 +418,1390 @@ def clamp_to_visible(monitor_x, monitor_y, monitor_w, monitor_h, target_x, targe
 
     return clamped_x, clamped_y
 
+def crop_rect(x, y, monitor_w, monitor_h, source_w, source_h, zoom):
+    # The crop filter rectangle of the zoom source centered on a monitor position, like get_target_position
+    # in the lua script. Without a zoom level (-1) the whole source is shown.
+    if zoom <= 0:
+        zoom = 1
+    w = source_w / zoom
+    h = source_h / zoom
+    left = clamp(x * source_w / monitor_w - w / 2, 0, source_w - w)
+    top = clamp(y * source_h / monitor_h - h / 2, 0, source_h - h)
+    return left, top, w, h
+
 def linear_transition(current, target, step_size=10):
     distance = target - current
     if abs(distance) <= step_size:
         return target
     return current + step_size if distance > 0 else current - step_size
 
-def get_monitor_area(index):
-    monitors = get_monitors()
-    if index < 0 or index >= len(monitors):
-        raise IndexError(f"Monitor index {index} out of range")
-    mon = monitors[index]
-    return mon.x, mon.y, mon.width, mon.height
+class Histogram:
+    # Fixed-memory latency histogram, log2 spaced buckets from 1us to ~1s plus one overflow bucket
+    BOUNDS = [2 ** i / 1e6 for i in range(21)]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        # Upper bound of the bucket that holds the quantile
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.BOUNDS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def prometheus(self, name, help_text):
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.BOUNDS, self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{{le=\"{bound:g}\"}} {cumulative}")
+        lines.append(f"{name}_bucket{{le=\"+Inf\"}} {self.count}")
+        lines.append(f"{name}_sum {self.total:.9f}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+class Stats:
+    # Optional instrumentation, the hot loop only times things while a Stats object exists.
+    # Counters are read from the objects that keep them anyway when a report is made.
+    def __init__(self):
+        self.tick = Histogram()
+        self.mouse = Histogram()
+        self.send = Histogram()
+        self.ws = Histogram()
+        self.started = time.monotonic()
+        self.last_report = (self.started, 0)
+        self.policy = None
+        self.scheduler = None
+        self.transport = None
+        self.follower = None
+
+    def attach(self, policy, scheduler, transport, follower):
+        self.policy = policy
+        self.scheduler = scheduler
+        self.transport = transport
+        self.follower = follower
+
+    def summary(self):
+        now = time.monotonic()
+        last_time, last_sent = self.last_report
+        sent = self.policy.sent
+        pps = (sent - last_sent) / (now - last_time) if now > last_time else 0.0
+        self.last_report = (now, sent)
+        ms = lambda h, q: h.quantile(q) * 1000
+        return (f"[stats] {pps:.1f} packets/s, {self.transport.bytes_sent} bytes, "
+                f"tick p50={ms(self.tick, 0.5):.3f}ms p99={ms(self.tick, 0.99):.3f}ms, "
+                f"mouse p50={ms(self.mouse, 0.5):.3f}ms, send p50={ms(self.send, 0.5):.3f}ms, "
+                f"ws p50={ms(self.ws, 0.5):.1f}ms ({self.ws.count} calls), "
+                f"overruns={self.scheduler.overruns}, cell switches={self.follower.cell_switches}")
+
+    def prometheus(self):
+        lines = []
+        lines += self.tick.prometheus("ozm_tick_duration_seconds", "Time spent working in one tick")
+        lines += self.mouse.prometheus("ozm_mouse_read_seconds", "Time to read the cursor position")
+        lines += self.send.prometheus("ozm_send_seconds", "Time to encode and send one packet")
+        lines += self.ws.prometheus("ozm_websocket_call_seconds", "Duration of OBS WebSocket requests")
+        counters = [
+            ("ozm_packets_sent_total", "Packets sent", self.policy.sent),
+            ("ozm_packets_skipped_total", "Unchanged positions that were not sent", self.policy.skipped),
+            ("ozm_bytes_sent_total", "Bytes sent", self.transport.bytes_sent),
+            ("ozm_tick_overruns_total", "Ticks that took longer than the period", self.scheduler.overruns),
+            ("ozm_cell_switches_total", "Snap grid cell changes", self.follower.cell_switches),
+        ]
+        for name, help_text, value in counters:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name} {value}"]
+        per_target = [
+            ("ozm_target_packets_sent_total", "counter", "Packets sent to one target", lambda t: t.sent),
+            ("ozm_target_rate_limited_total", "counter", "Positions held back by the target rate limit", lambda t: t.rate_limited),
+            ("ozm_target_send_errors_total", "counter", "Packets dropped because sending failed", lambda t: t.errors),
+            ("ozm_target_refused_total", "counter", "Packets refused with ICMP port unreachable", lambda t: t.refused),
+            ("ozm_target_lost_total", "counter", "Packets the receiver reported missing", lambda t: t.lost),
+            ("ozm_target_latency_ms", "gauge", "Latency the receiver measured", lambda t: t.latency),
+        ]
+        for name, kind, help_text, value in per_target:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for target in self.transport.targets:
+                if value(target) is not None:
+                    lines.append(f"{name}{{target=\"{target.name}\"}} {value(target)}")
+        lines += ["# HELP ozm_uptime_seconds Seconds since the server started", "# TYPE ozm_uptime_seconds gauge",
+                  f"ozm_uptime_seconds {time.monotonic() - self.started:.3f}"]
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        stats = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = stats.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=server.serve_forever, name="stats-http", daemon=True).start()
+        return server
+
+class SendPolicy:
+    # Decides which positions are worth a packet and how long to wait until the next tick.
+    # Unchanged positions are only resent as a heartbeat, fast motion shortens the tick delay.
+    # The speed is measured over the real time since the last send, in pixels per MOTION_REFERENCE,
+    # so a shorter tick doesn't read as slower motion.
+    def __init__(self, delay, heartbeat=0.5, fast_delay=-1, fast_speed=20.0):
+        self.delay = delay
+        self.heartbeat = heartbeat
+        self.fast_delay = fast_delay
+        self.fast_speed = fast_speed
+        self.last_pos = None
+        self.last_send = 0.0
+        self.speed = 0.0
+        self.sent = 0
+        self.skipped = 0
+
+    def measure_speed(self, distance, now):
+        elapsed = now - self.last_send
+        return distance * MOTION_REFERENCE / elapsed if elapsed > 0 else distance
+
+    def should_send(self, x, y, now):
+        last = self.last_pos
+        if last is not None:
+            self.speed = self.measure_speed(math.hypot(x - last[0], y - last[1]), now)
+            if self.heartbeat > 0 and self.speed == 0 and now - self.last_send < self.heartbeat:
+                self.skipped += 1
+                return False
+        self.last_pos = (x, y)
+        self.last_send = now
+        self.sent += 1
+        return True
+
+    def should_send_slots(self, positions, now):
+        # All slots go out in one packet, the fastest slot decides
+        last = self.last_pos
+        pos = tuple(map(int, positions))
+        if last is not None and len(last) == len(pos):
+            self.speed = self.measure_speed(
+                max(math.hypot(pos[i] - last[i], pos[i + 1] - last[i + 1]) for i in range(0, len(pos), 2)), now)
+            if self.heartbeat > 0 and self.speed == 0 and now - self.last_send < self.heartbeat:
+                self.skipped += 1
+                return False
+        self.last_pos = pos
+        self.last_send = now
+        self.sent += 1
+        return True
+
+    def next_delay(self):
+        if self.fast_delay >= 0 and self.speed >= self.fast_speed:
+            return min(self.delay, self.fast_delay)
+        return self.delay
+
+    def shortest_delay(self):
+        return min(self.delay, self.fast_delay) if self.fast_delay >= 0 else self.delay
+
+    def summary(self):
+        total = self.sent + self.skipped
+        saved = (self.skipped / total * 100) if total else 0.0
+        return f"Sent {self.sent} packets, skipped {self.skipped} unchanged ones ({saved:.1f}% saved)"
+
+# Binary packet: magic, version, kind, slot, timestamp (unix us), sequence, monitor, x, y
+WIRE_MAGIC = b"OZMR"
+WIRE_ACK_MAGIC = b"OZMA"
+WIRE_VERSION = 1
+WIRE_KIND_POSITION = 0
+WIRE_KIND_SLOTS = 1
+WIRE_KIND_CROP = 2
+WIRE_PACKET = struct.Struct("<4sBBHqIIff")
+# Crop packet (--crop): the position packet with the crop left, top, width and height instead of x and y
+WIRE_CROP_PACKET = struct.Struct("<4sBBHqIIffff")
+# Slots packet: the same header up to the sequence (slot holds the slot count), then the arrays of SlotFrame
+WIRE_SLOTS_HEADER = struct.Struct("<4sBBHqI")
+WIRE_MAX_SLOTS = 100  # Keeps one packet below a typical MTU
+WIRE_SEQ = struct.Struct("<I")
+WIRE_SEQ_OFFSET = 16
+WIRE_NO_MONITOR = 0xFFFFFFFF
+# Acknowledgement from the lua script: magic, version, flags, received count, last sequence, latency ms
+WIRE_ACK = struct.Struct("<4sBBHIf")
+WIRE_ACK_RECEIVED = 1  # Flag: the received count is filled in (low 16 bits)
+# Shared memory file for a lua script on the same machine: magic, version, two reserved fields, the
+# seqlock counter (odd while the packet is rewritten) and the packet length, then the newest binary packet
+SHM_MAGIC = b"OZMS"
+SHM_VERSION = 1
+SHM_HEADER = struct.Struct("<4sBBHII")
+SHM_LOCK = struct.Struct("<II")
+SHM_LOCK_OFFSET = 8
+SHM_SIZE = 4096  # One page, holds the largest slots packet
+
+class WireFrame:
+    # One position, encoded at most once per packet format however many targets it goes to.
+    # A frame and its packet buffer are reused for every position, targets only patch their own
+    # sequence number into the binary packet before sending it.
+    __slots__ = ("x", "y", "monitor", "slot", "text", "packet", "packed")
+
+    def __init__(self, x=0.0, y=0.0, monitor=None, slot=0):
+        self.packet = bytearray(WIRE_PACKET.size)
+        self.update(x, y, monitor, slot)
+
+    def update(self, x, y, monitor=None, slot=0):
+        self.x = x
+        self.y = y
+        self.monitor = monitor
+        self.slot = slot
+        self.text = None
+        self.packed = False
+
+    def encode_text(self):
+        if self.text is None:
+            if self.monitor is not None:
+                self.text = b"%d %d %d" % (self.x, self.y, self.monitor)
+            else:
+                self.text = b"%d %d" % (self.x, self.y)
+        return self.text
+
+    def encode_binary(self, seq):
+        if not self.packed:
+            WIRE_PACKET.pack_into(self.packet, 0, WIRE_MAGIC, WIRE_VERSION, WIRE_KIND_POSITION, self.slot,
+                time.time_ns() // 1000, 0, WIRE_NO_MONITOR if self.monitor is None else self.monitor, self.x, self.y)
+            self.packed = True
+        WIRE_SEQ.pack_into(self.packet, WIRE_SEQ_OFFSET, seq)
+        return self.packet
+
+class CropFrame(WireFrame):
+    # A position sent as the crop rectangle of the zoom source, the lua script applies it as it is.
+    # The text format still carries the position, receivers that only speak text keep following it.
+    __slots__ = ("crop",)
+
+    def __init__(self):
+        super().__init__()
+        self.packet = bytearray(WIRE_CROP_PACKET.size)
+        self.crop = (0.0, 0.0, 0.0, 0.0)
+
+    def update_crop(self, x, y, monitor, crop):
+        self.update(x, y, monitor)
+        self.crop = crop
+
+    def encode_binary(self, seq):
+        if not self.packed:
+            WIRE_CROP_PACKET.pack_into(self.packet, 0, WIRE_MAGIC, WIRE_VERSION, WIRE_KIND_CROP, 0,
+                time.time_ns() // 1000, 0, WIRE_NO_MONITOR if self.monitor is None else self.monitor, *self.crop)
+            self.packed = True
+        WIRE_SEQ.pack_into(self.packet, WIRE_SEQ_OFFSET, seq)
+        return self.packet
+
+class SlotFrame:
+    # All slots of a SlotBatch in one packet: the header, the monitor index of every slot as uint32,
+    # then x and y of every slot as float32. The arrays of the batch are copied in as they are, the
+    # wire is little endian like every platform OBS runs on. The text format only carries the first slot.
+    __slots__ = ("batch", "text", "packet", "packed")
+
+    def __init__(self, batch):
+        self.batch = batch
+        self.packet = bytearray(WIRE_SLOTS_HEADER.size + 12 * len(batch.monitors))
+        self.text = None
+        self.packed = False
+
+    def update(self):
+        self.text = None
+        self.packed = False
+
+    def encode_text(self):
+        if self.text is None:
+            positions, monitor = self.batch.positions, self.batch.monitors[0]
+            if monitor != WIRE_NO_MONITOR:
+                self.text = b"%d %d %d" % (positions[0], positions[1], monitor)
+            else:
+                self.text = b"%d %d" % (positions[0], positions[1])
+        return self.text
+
+    def encode_binary(self, seq):
+        if not self.packed:
+            batch = self.batch
+            count = len(batch.monitors)
+            start = WIRE_SLOTS_HEADER.size
+            WIRE_SLOTS_HEADER.pack_into(self.packet, 0, WIRE_MAGIC, WIRE_VERSION, WIRE_KIND_SLOTS, count,
+                time.time_ns() // 1000, 0)
+            self.packet[start:start + 4 * count] = batch.monitors
+            self.packet[start + 4 * count:] = batch.positions
+            self.packed = True
+        WIRE_SEQ.pack_into(self.packet, WIRE_SEQ_OFFSET, seq)
+        return self.packet
+
+RESOLVE_INTERVAL = 60.0  # Names are looked up again this often, the receiver may have moved
+RESOLVE_RETRY = 5.0  # And this soon after sending failed
+
+def is_ip_address(host):
+    for family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            socket.inet_pton(family, host)
+            return True
+        except OSError:
+            pass
+    return False
+
+def resolve_target(host, port):
+    # The lua receiver only listens on IPv4, so IPv4 is preferred when a name has both
+    infos = socket.getaddrinfo(host, port, socket.AF_UNSPEC, socket.SOCK_DGRAM)
+    infos.sort(key=lambda info: info[0] != socket.AF_INET)
+    return infos[0][0], infos[0][4]
+
+class UdpTransport:
+    # Sends positions to one lua receiver. In auto mode the text format is used until the receiver
+    # acknowledges a binary probe packet; old receivers simply ignore the probes.
+    # The socket is connected to the resolved address, so the kernel does not look the address up per
+    # packet and reports ICMP port unreachable on the next send. Sends never block: a full socket
+    # buffer or an unreachable receiver only drops the packet and is counted.
+    def __init__(self, host, port, wire="auto", rate=0.0):
+        self.host = host
+        self.port = port
+        self.name = f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+        self.wire = wire
+        self.binary = wire == "binary"
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_send = 0.0
+        self.pending = None  # Newest frame held back by the rate limit
+        self.frame = WireFrame()
+        # Every run starts at a random sequence number, a restarted server would otherwise look like
+        # reordered packets of the previous run to the lua script until it passed the old number
+        self.seq = int.from_bytes(os.urandom(4), "little")
+        self.slot = 0
+        self.monitor = None  # Only sent while following the cursor across monitors
+        self.latency = None
+        self.acks = 0
+        self.last_ack = None  # Sequence and received count of the previous binary acknowledgement
+        self.probes = 0
+        self.sent = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.refused = 0
+        self.lost = 0
+        self.bytes_sent = 0
+        self.next_check = 0.0
+        self.sock = None
+        self.address = None
+        self.failing = False  # Sending failed since the last check
+        self.resolving = False
+        self.resolved = None  # Family and address found by the background lookup, applied by check()
+        self.resolve_error = None
+        self.last_resolve = None
+        self.next_resolve = None
+        self.fixed = is_ip_address(host)  # Addresses are never looked up again, only names
+        try:
+            self.connect(*resolve_target(host, port))
+        except OSError as e:
+            self.resolve_error = str(e)
+            print(f"Could not resolve {self.name}, retrying in the background: {e}")
+
+    def connect(self, family, address):
+        if address == self.address:
+            return
+        if self.sock is None or self.sock.family != family:
+            if self.sock is not None:
+                self.sock.close()
+            self.sock = socket.socket(family, socket.SOCK_DGRAM)
+            self.sock.setblocking(False)
+        self.sock.connect(address)
+        if self.address is not None:
+            print(f"{self.name} now resolves to {address[0]}")
+        self.address = address
+
+    def resolve(self):
+        # A slow name server must not stall the loop, check() picks the result up
+        if self.resolving:
+            return
+        self.resolving = True
+        threading.Thread(target=self.resolve_worker, daemon=True).start()
+
+    def resolve_worker(self):
+        try:
+            self.resolved = resolve_target(self.host, self.port)
+            self.resolve_error = None
+        except OSError as e:
+            if str(e) != self.resolve_error:
+                print(f"Could not resolve {self.name}: {e}")
+            self.resolve_error = str(e)
+        finally:
+            self.resolving = False
+
+    def encode(self, x, y):
+        self.frame.update(x, y, self.monitor, self.slot)
+        return self.encode_frame(self.frame)
+
+    def encode_frame(self, frame):
+        if self.binary:
+            return frame.encode_binary(self.seq)
+        return frame.encode_text()
+
+    def send(self, x, y, now):
+        self.frame.update(x, y, self.monitor, self.slot)
+        self.send_frame(self.frame, now)
+
+    def send_frame(self, frame, now):
+        if now < self.next_send:
+            # Over the rate limit, the newest frame is sent by flush() once it is allowed
+            self.rate_limited += 1
+            self.pending = frame
+            return
+        self.pending = None
+        if self.interval:
+            self.next_send = now + self.interval
+
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        if now >= self.next_check:
+            self.check(frame, now)
+        if self.address is None:
+            self.errors += 1
+            self.failing = True
+            return
+
+        data = self.encode_frame(frame)
+        try:
+            self.sock.send(data)
+        except ConnectionRefusedError:
+            # An earlier packet came back as ICMP port unreachable, nothing listens there (yet)
+            self.refused += 1
+            self.failing = True
+            return
+        except OSError:
+            self.errors += 1
+            self.failing = True
+            return
+        self.sent += 1
+        self.bytes_sent += len(data)
+
+    def flush(self, now):
+        if self.pending is not None and now >= self.next_send:
+            self.send_frame(self.pending, now)
+
+    def check(self, frame, now):
+        self.check_address(now)
+        if self.address is None:
+            self.next_check = now + 1.0
+            return
+
+        # Read acknowledgements (they also carry the latency and packet count the receiver measured)
+        try:
+            while True:
+                data = self.sock.recv(64)
+                if len(data) == WIRE_ACK.size and data[:4] == WIRE_ACK_MAGIC:
+                    _, version, flags, received, seq, latency = WIRE_ACK.unpack(data)
+                    self.acks += 1
+                    self.latency = latency if latency >= 0 else None
+                    if not self.binary and self.wire == "auto" and version == WIRE_VERSION:
+                        print(f"Receiver {self.name} understands binary packets, switching from text")
+                        self.binary = True
+                    elif self.binary and flags & WIRE_ACK_RECEIVED:
+                        # Everything sent between two acknowledgements that did not arrive was lost
+                        if self.last_ack is not None:
+                            sent = (seq - self.last_ack[0]) & 0xFFFFFFFF
+                            if sent < 0x80000000:
+                                self.lost += max(sent - ((received - self.last_ack[1]) & 0xFFFF), 0)
+                        self.last_ack = (seq, received)
+        except ConnectionRefusedError:
+            self.refused += 1
+            self.failing = True
+        except OSError:
+            pass
+
+        if self.wire == "auto" and not self.binary:
+            # Probe every second at first, then only every 30s for receivers that never answer
+            self.probes += 1
+            try:
+                self.sock.send(frame.encode_binary(self.seq))
+            except OSError:
+                pass
+            self.next_check = now + (1.0 if self.probes < 10 else 30.0)
+        else:
+            self.next_check = now + 1.0
+
+    def check_address(self, now):
+        if self.resolved is not None:
+            resolved, self.resolved = self.resolved, None
+            try:
+                self.connect(*resolved)
+            except OSError as e:
+                print(f"Could not connect to {self.name}: {e}")
+
+        # Names are looked up again on a timer, and soon after sending failed
+        if self.last_resolve is None:
+            self.last_resolve = now
+            self.next_resolve = now + (RESOLVE_RETRY if self.address is None else RESOLVE_INTERVAL)
+        if self.failing:
+            self.failing = False
+            self.next_resolve = min(self.next_resolve, self.last_resolve + RESOLVE_RETRY)
+        if now >= self.next_resolve and (self.address is None or not self.fixed):
+            self.last_resolve = now
+            self.next_resolve = now + RESOLVE_INTERVAL
+            self.resolve()
+
+    def summary(self):
+        mode = "binary" if self.binary else "text"
+        latency = f", receiver latency {self.latency:.2f}ms" if self.latency is not None else ""
+        lost = f", {self.lost} lost" if self.last_ack is not None else ""
+        limited = f", {self.rate_limited} rate limited" if self.interval else ""
+        refused = f", {self.refused} refused (nothing listening)" if self.refused else ""
+        errors = f", {self.errors} send errors" if self.errors else ""
+        return f"{self.name} sent {self.sent} packets as {mode}{latency}{lost}{limited}{refused}{errors}"
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+
+class ShmTransport:
+    # Writes every position into a small memory-mapped file that the lua script maps as well and reads
+    # when OBS renders a frame, so there is no socket and no poll timer in between. Only the newest
+    # packet is kept. A seqlock guards it: the counter is odd while the packet is rewritten and a reader
+    # that sees it change copies again. Positions are always binary, nothing is acknowledged.
+    def __init__(self, path):
+        self.path = path
+        self.name = path
+        self.pending = None
+        self.latency = None
+        self.seq = 0
+        self.lock = 0
+        self.sent = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.refused = 0
+        self.lost = 0
+        self.bytes_sent = 0
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < SHM_SIZE:
+                os.ftruncate(fd, SHM_SIZE)
+            self.mm = mmap.mmap(fd, SHM_SIZE)
+        finally:
+            os.close(fd)
+
+        # A script that is still attached drops packets older than the ones it has seen, so a restart
+        # continues the sequence of the previous run
+        magic, version, _, _, lock, length = SHM_HEADER.unpack_from(self.mm)
+        if magic == SHM_MAGIC and version == SHM_VERSION and length >= WIRE_SLOTS_HEADER.size:
+            self.lock = (lock + 1) & ~1 & 0xFFFFFFFF
+            self.seq = WIRE_SEQ.unpack_from(self.mm, SHM_HEADER.size + WIRE_SEQ_OFFSET)[0]
+        else:
+            SHM_HEADER.pack_into(self.mm, 0, SHM_MAGIC, SHM_VERSION, 0, 0, 0, 0)
+
+    def send_frame(self, frame, now):
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        data = frame.encode_binary(self.seq)
+        start = SHM_HEADER.size
+        self.lock = (self.lock + 1) & 0xFFFFFFFF
+        SHM_LOCK.pack_into(self.mm, SHM_LOCK_OFFSET, self.lock, len(data))
+        self.mm[start:start + len(data)] = data
+        self.lock = (self.lock + 1) & 0xFFFFFFFF
+        SHM_LOCK.pack_into(self.mm, SHM_LOCK_OFFSET, self.lock, len(data))
+        self.sent += 1
+        self.bytes_sent += len(data)
+
+    def flush(self, now):
+        pass
+
+    def summary(self):
+        return f"{self.name} sent {self.sent} packets as shared memory"
+
+    def close(self):
+        self.mm.close()
+
+class FanOut:
+    # Sends every position to all targets from one sampling loop. The frame is encoded once per
+    # packet format, each target keeps its own rate limit, sequence numbers and counters.
+    def __init__(self, targets):
+        self.targets = targets
+        self.monitor = None
+        self.slot = 0
+        self.frame = WireFrame()
+        self.crop_frame = CropFrame()
+
+    @property
+    def bytes_sent(self):
+        return sum(target.bytes_sent for target in self.targets)
+
+    @property
+    def latency(self):
+        # Mean of the latencies the receivers reported, None before the first acknowledgement
+        known = [target.latency for target in self.targets if target.latency is not None]
+        return sum(known) / len(known) if known else None
+
+    def send(self, x, y, now):
+        # Targets holding the frame back for their rate limit send the newest position with it later
+        self.frame.update(x, y, self.monitor, self.slot)
+        for target in self.targets:
+            target.send_frame(self.frame, now)
+
+    def send_crop(self, x, y, crop, now):
+        self.crop_frame.update_crop(x, y, self.monitor, crop)
+        for target in self.targets:
+            target.send_frame(self.crop_frame, now)
+
+    def send_slots(self, frame, now):
+        frame.update()
+        for target in self.targets:
+            target.send_frame(frame, now)
+
+    def flush(self, now):
+        for target in self.targets:
+            if target.pending is not None:
+                target.flush(now)
+
+    def summary(self):
+        return "\n".join(target.summary() for target in self.targets)
+
+    def close(self):
+        for target in self.targets:
+            target.close()
+
+def create_transport(args):
+    count = max(len(args.ip), len(args.port), len(args.rate))
+    pick = lambda values, i: values[i] if len(values) > 1 else values[0]
+    targets = [
+        UdpTransport(pick(args.ip, i), pick(args.port, i), wire=args.wire, rate=pick(args.rate, i))
+        for i in range(count)
+    ]
+    if args.shm:
+        # Next to the UDP targets, those still serve OBS on other machines
+        targets.append(ShmTransport(resolve_config_path(args.shm)))
+        print(f"Positions for an OBS script on this machine are written to:\n> {targets[-1].path}")
+    return FanOut(targets)
+
+class TickScheduler:
+    # Paces the loop on absolute monotonic deadlines, so the time spent working is part of the period.
+    # Ticks that were missed are merged into one instead of being caught up in a burst.
+    # Once locked to a frame rate the deadlines sit on a fixed grid of the monotonic clock (shifted by
+    # phase). OBS renders on the same clock, so every tick keeps the same distance to its frame.
+    def __init__(self, period, spin=0.0, phase=None):
+        self.period = period
+        self.spin = spin
+        self.phase = phase
+        self.deadline = None
+        self.ticks = 0
+        self.overruns = 0
+        self.merged = 0
+        self.jitter_total = 0.0
+        self.jitter_max = 0.0
+
+    def lock(self, period, phase=0.0):
+        # The next wait starts on the grid
+        self.period = period
+        self.phase = phase
+        self.deadline = None
+
+    def wait(self):
+        now = time.monotonic()
+        if self.deadline is None:
+            self.deadline = now if self.phase is None else now - (now - self.phase) % self.period
+        self.deadline += self.period
+        self.ticks += 1
+        if self.period <= 0:
+            # --delay 0 runs flat out, there is no deadline to be late for or to hit
+            self.deadline = now
+            return
+
+        late = now - self.deadline
+        if late > 0:
+            # The work took longer than the period, start counting again from now
+            self.overruns += 1
+            self.merged += int(late / self.period)
+            if self.phase is None:
+                self.deadline = now
+            else:
+                # Or from the last grid point, so the ticks stay on the frames
+                self.deadline += int(late / self.period) * self.period
+            return
+
+        remaining = self.deadline - now
+        if remaining > self.spin:
+            time.sleep(remaining - self.spin)
+        now = time.monotonic()
+        while now < self.deadline:
+            now = time.monotonic()
+
+        jitter = now - self.deadline
+        self.jitter_total += jitter
+        if jitter > self.jitter_max:
+            self.jitter_max = jitter
+
+    def summary(self):
+        if self.period <= 0:
+            return f"Ticks: {self.ticks} (no delay, not paced)"
+        on_time = self.ticks - self.overruns
+        mean = (self.jitter_total / on_time * 1000) if on_time else 0.0
+        return (f"Ticks: {self.ticks}, overruns: {self.overruns} ({self.merged} ticks merged), "
+                f"jitter mean={mean:.3f}ms max={self.jitter_max * 1000:.3f}ms")
+
+class JitterFilter:
+    # One Euro filter: a low-pass on the raw cursor whose cutoff rises with the speed, so hand tremor
+    # and sensor noise are smoothed while the cursor rests and fast moves pass with little lag. Both
+    # axes share the cutoff of the (itself low-passed) speed, the state is a few numbers per axis.
+    def __init__(self, min_cutoff=1.0, beta=0.05, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff  # Hz while resting
+        self.beta = beta  # Hz added per pixel per second
+        self.d_cutoff = d_cutoff
+        self.last = None
+
+    def reset(self):
+        self.last = None
+
+    def update(self, x, y, now):
+        if self.last is None or now - self.last > 0.25:
+            # First sample or a long pause (follow was off), start again at the cursor
+            self.last = now
+            self.x, self.y = x, y
+            self.vx = self.vy = 0.0
+            return x, y
+
+        dt = now - self.last
+        if dt <= 0:
+            return self.x, self.y
+        self.last = now
+
+        a = self._alpha(self.d_cutoff, dt)
+        self.vx += a * ((x - self.x) / dt - self.vx)
+        self.vy += a * ((y - self.y) / dt - self.vy)
+
+        a = self._alpha(self.min_cutoff + self.beta * math.hypot(self.vx, self.vy), dt)
+        self.x += a * (x - self.x)
+        self.y += a * (y - self.y)
+        return self.x, self.y
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+# Half a 60fps frame, the average wait until OBS renders the new crop
+PREDICT_FRAME_DELAY = 1 / 120
+
+class Predictor:
+    # Alpha-beta-gamma filter per axis: estimates position, velocity and acceleration from the samples
+    # and extrapolates by the lead time. The lead fades out while the cursor slows down and never
+    # points backwards, so the prediction does not overshoot where the cursor stops.
+    def __init__(self, lead, alpha=0.5, beta=0.2, gamma=0.02, stop_speed=150.0):
+        self.lead = lead
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.stop_speed = stop_speed  # Pixels per second where the lead is halved
+        self.last = None
+
+    def reset(self):
+        self.last = None
+
+    def update(self, x, y, now):
+        if self.last is None or now - self.last > 0.25:
+            # First sample or a long pause (follow was off), start again without velocity
+            self.last = now
+            self.x, self.y = x, y
+            self.raw_x, self.raw_y = x, y
+            self.vx = self.vy = self.ax = self.ay = 0.0
+            self.predicted = (x, y)
+            return self.predicted
+
+        dt = now - self.last
+        if dt <= 0:
+            return self.predicted
+        self.last = now
+
+        self.x, self.vx, self.ax = self._axis(self.x, self.vx, self.ax, x, dt)
+        self.y, self.vy, self.ay = self._axis(self.y, self.vy, self.ay, y, dt)
+
+        # The lead is added to the measured position, the filter only supplies the motion. It fades
+        # with the slower of the filtered and the raw speed, so it is gone as soon as the cursor rests.
+        raw_vx = (x - self.raw_x) / dt
+        raw_vy = (y - self.raw_y) / dt
+        self.raw_x, self.raw_y = x, y
+        speed2 = min(self.vx * self.vx + self.vy * self.vy, raw_vx * raw_vx + raw_vy * raw_vy)
+        stop2 = self.stop_speed * self.stop_speed
+        damping = speed2 / (speed2 + stop2)
+
+        lead = self.lead
+        dx = self.vx * lead + 0.5 * self.ax * lead * lead
+        dy = self.vy * lead + 0.5 * self.ay * lead * lead
+        if dx * raw_vx + dy * raw_vy <= 0:
+            # Never extrapolate against the way the cursor actually moves
+            self.predicted = (x, y)
+        else:
+            self.predicted = (x + dx * damping, y + dy * damping)
+        return self.predicted
+
+    def _axis(self, pos, vel, acc, measured, dt):
+        pos += vel * dt + 0.5 * acc * dt * dt
+        vel += acc * dt
+        residual = measured - pos
+        pos += self.alpha * residual
+        vel += self.beta * residual / dt
+        acc += 2 * self.gamma * residual / (dt * dt)
+        return pos, vel, acc
+
+def auto_predict_lead(delay, latency_ms):
+    # Samples are half a tick old on average, then the measured latency (UDP hop and the lua poll
+    # timer) and the wait for the next OBS frame
+    lead = delay / 2 + PREDICT_FRAME_DELAY
+    if latency_ms is not None:
+        lead += latency_ms / 1000
+    return clamp(lead, 0.0, 0.2)
+
+class Follower:
+    # The per-tick pipeline from a raw cursor sample to the smoothed zoom position: filter the jitter,
+    # predict ahead, snap to the grid, keep the zoomed area on the monitor, then smooth towards that target.
+    def __init__(self, args, monitor_w, monitor_h, x, y):
+        self.args = args
+        self.monitor_w = monitor_w
+        self.monitor_h = monitor_h
+        self.x = x
+        self.y = y
+        self.cell = None  # Start with no cell locked
+        self.cell_switches = 0
+        self.c = 0  # For debug printing
+        self.regions = None
+        # The regions file is only read here, the loop rescales the parsed regions
+        self.region_file = read_regions(resolve_config_path(args.regions)) if args.regions else None
+        self.build_regions()
+        self.predictor = None
+        self.build_predictor()
+        self.jitter_filter = None
+        self.build_jitter_filter()
+        self.motion = MotionEngine(args.motion)
+
+    def build_predictor(self):
+        args = self.args
+        if args.predict > 0:
+            self.predictor = Predictor(args.predict / 1000.0)
+        elif args.predict < 0:
+            self.predictor = Predictor(auto_predict_lead(args.delay / 1000.0, None))
+        else:
+            self.predictor = None
+
+    def build_jitter_filter(self):
+        args = self.args
+        if args.jitter_cutoff > 0:
+            self.jitter_filter = JitterFilter(args.jitter_cutoff, max(args.jitter_beta, 0.0))
+        else:
+            self.jitter_filter = None
+
+    def build_regions(self):
+        # Compiled once, and again when the grid settings or the monitor change
+        args = self.args
+        if self.region_file is not None:
+            self.regions = RegionMap.from_regions(self.region_file, self.monitor_w, self.monitor_h, args.padding)
+        elif args.columns > 0 and args.rows > 0:
+            self.regions = RegionMap.from_grid(self.monitor_w, self.monitor_h, args.columns, args.rows, args.padding)
+        else:
+            self.regions = None
+        self.cell = None
+
+    def set_monitor(self, monitor_w, monitor_h, x, y):
+        # Positions on another monitor are not comparable, start over at the cursor
+        self.monitor_w = monitor_w
+        self.monitor_h = monitor_h
+        self.x = x
+        self.y = y
+        self.build_regions()
+        self.motion.reset()
+        if self.predictor:
+            self.predictor.reset()
+        if self.jitter_filter:
+            self.jitter_filter.reset()
+
+    def step(self, raw_x, raw_y, now=None):
+        args = self.args
+        self.c += 1
+
+        if self.jitter_filter is not None and now is not None:
+            raw_x, raw_y = self.jitter_filter.update(raw_x, raw_y, now)
+
+        if self.predictor is not None and now is not None:
+            raw_x, raw_y = self.predictor.update(raw_x, raw_y, now)
+            raw_x = clamp(raw_x, 0, self.monitor_w)
+            raw_y = clamp(raw_y, 0, self.monitor_h)
+
+        regions = self.regions
+        if regions is not None:
+            cell = regions.snap(raw_x, raw_y, self.cell)
+            if cell != self.cell:
+                if self.cell is not None and cell is not None:
+                    self.cell_switches += 1
+                self.cell = cell
+            if cell is not None:
+                target_x = regions.centers[cell * 2]
+                target_y = regions.centers[cell * 2 + 1]
+            else:
+                # Outside of every region, follow the cursor
+                target_x, target_y = raw_x, raw_y
+        else:
+            target_x, target_y = raw_x, raw_y
+
+        target_x, target_y = clamp_to_visible(0, 0, self.monitor_w, self.monitor_h, target_x, target_y, args.zoom)
+
+        # Smooth *towards the target*, over the time since the last step
+        self.x, self.y = self.motion.step(
+            self.x, self.y,
+            target_x, target_y,
+            now,
+            factor=args.factor,
+            min_step=args.minstep,
+            max_step=args.maxstep
+        )
+
+        if self.c % 100 == 0:
+            #print(f"x: {self.x:.2f}, y: {self.y:.2f}")
+            #print("Raw:", raw_x, raw_y)
+            #print("SnapTarget:", target_x, target_y)
+            #print("Smoothed:", int(self.x), int(self.y))
+            pass
+
+        return self.x, self.y
+
+# The settings a slot may override and the JSON types they take
+SLOT_SETTINGS = {
+    "monitor": int,
+    "rows": int,
+    "columns": int,
+    "padding": float,
+    "regions": str,
+    "zoom": float,
+    "motion": str,
+    "factor": float,
+    "minstep": float,
+    "maxstep": float,
+    "predict": float,
+    "jitter_cutoff": float,
+    "jitter_beta": float,
+}
+
+def read_slots(path):
+    # [{"monitor": 0, "columns": 2, "rows": 2}, {"monitor": 1, "zoom": 3, "factor": 0.02}, ...];
+    # settings a slot leaves out come from the command line, monitor defaults to the slot index (-1 follows the cursor)
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Could not read the slots file {path}: {e}")
+    if isinstance(data, dict):
+        data = data.get("slots", [])
+    if not isinstance(data, list) or not data:
+        raise ValueError(f"{path} needs a list of slots")
+    if len(data) > WIRE_MAX_SLOTS:
+        raise ValueError(f"{path} has {len(data)} slots, at most {WIRE_MAX_SLOTS} fit into one packet")
+    for i, slot in enumerate(data):
+        if not isinstance(slot, dict):
+            raise ValueError(f"Slot {i} in {path} is not an object")
+        unknown = sorted(set(slot) - set(SLOT_SETTINGS))
+        if unknown:
+            raise ValueError(f"Slot {i} in {path} has unknown settings: {", ".join(unknown)}")
+        for name, value in slot.items():
+            kind = SLOT_SETTINGS[name]
+            if name == "regions" and value is None:
+                # Turns the --regions of the command line off for this slot
+                continue
+            # Whole numbers are fine for floats, true and false are no numbers
+            accepted = (int, float) if kind is float else kind
+            if isinstance(value, bool) or not isinstance(value, accepted):
+                expected = {int: "a whole number", float: "a number", str: "a string"}[kind]
+                raise ValueError(f"Slot {i} in {path}: {name} needs {expected}, got {json.dumps(value)}")
+        if slot.get("motion", MOTION_PROFILES[0]) not in MOTION_PROFILES:
+            raise ValueError(f"Slot {i} in {path}: motion needs one of {", ".join(MOTION_PROFILES)}")
+    return data
+
+class SlotBatch:
+    # Several follow slots fed by one cursor, e.g. one zoom source per monitor in the same OBS scene.
+    # Every slot is a Follower with its own monitor and settings; the results are kept in flat arrays
+    # that SlotFrame copies into one packet per tick. The slots are not vectorized: each one runs the
+    # whole pipeline, so the cost grows with the slot count (about 8us per slot).
+    def __init__(self, args, slots, layout, mouse_x, mouse_y):
+        self.layout = layout
+        self.layout_version = layout.version
+        self.followers = []
+        self.indices = []
+        self.areas = []
+        self.auto = []
+        self.monitors = array("I", [WIRE_NO_MONITOR]) * len(slots)
+        self.positions = array("f", [0.0]) * (2 * len(slots))
+        for i, slot in enumerate(slots):
+            slot_args = argparse.Namespace(**{**vars(args), **slot})
+            index = slot.get("monitor", i)
+            auto = index < 0
+            if auto:
+                index = layout.find(mouse_x, mouse_y, 0)
+                self.monitors[i] = index
+            area = layout.area(index)
+            if area is None:
+                raise IndexError(f"Slot {i}: monitor index {index} out of range")
+            area_x, area_y, area_w, area_h = area
+            self.followers.append(Follower(slot_args, area_w, area_h,
+                clamp(mouse_x - area_x, 0, area_w), clamp(mouse_y - area_y, 0, area_h)))
+            self.indices.append(index)
+            self.areas.append(area)
+            self.auto.append(auto)
+        self.any_auto = any(self.auto)
+        self.frame = SlotFrame(self)
+
+    @property
+    def cell_switches(self):
+        return sum(follower.cell_switches for follower in self.followers)
+
+    def update_monitors(self, mouse_x, mouse_y):
+        layout = self.layout
+        self.layout_version = layout.version
+        for i, follower in enumerate(self.followers):
+            index = layout.find(mouse_x, mouse_y, self.indices[i]) if self.auto[i] else self.indices[i]
+            area = layout.area(index)
+            if area is not None and (index != self.indices[i] or area != self.areas[i]):
+                area_x, area_y, area_w, area_h = area
+                follower.set_monitor(area_w, area_h, clamp(mouse_x - area_x, 0, area_w), clamp(mouse_y - area_y, 0, area_h))
+                self.indices[i] = index
+                self.areas[i] = area
+                if self.auto[i]:
+                    self.monitors[i] = index
+                print(f"Slot {i} follows monitor {index}: x={area_x}, y={area_y}, w={area_w}, h={area_h}")
+
+    def step(self, mouse_x, mouse_y, now):
+        if self.any_auto or self.layout.version != self.layout_version:
+            self.update_monitors(mouse_x, mouse_y)
+        positions = self.positions
+        i = 0
+        for follower, (area_x, area_y, area_w, area_h) in zip(self.followers, self.areas):
+            positions[i], positions[i + 1] = follower.step(
+                clamp(mouse_x - area_x, 0, area_w), clamp(mouse_y - area_y, 0, area_h), now)
+            i += 2
+        return positions
+
+# Trace file: header (magic, version, reserved, monitor x/y/w/h, args json length), args json,
+# then little endian float64 triples of (seconds since start, x, y) relative to the monitor
+TRACE_MAGIC = b"OZMT"
+TRACE_VERSION = 1
+TRACE_HEADER = struct.Struct("<4sHHiiiiI")
+# Args that are not part of the follow pipeline stay out of the trace, traces get shared
+TRACE_IGNORE = ("wspassword", "keyfile", "control", "config_file")
+
+class TraceWriter:
+    def __init__(self, path, monitor, args, flush_every=4096):
+        self.file = open(path, "wb")
+        meta = json.dumps({k: v for k, v in vars(args).items() if k not in TRACE_IGNORE}).encode()
+        self.file.write(TRACE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, 0, *monitor, len(meta)))
+        self.file.write(meta)
+        self.samples = array("d")
+        self.flush_every = flush_every * 3
+        self.count = 0
+
+    def add(self, t, x, y):
+        samples = self.samples
+        samples.append(t)
+        samples.append(x)
+        samples.append(y)
+        self.count += 1
+        if len(samples) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if sys.byteorder == "big":
+            self.samples.byteswap()
+        self.samples.tofile(self.file)
+        del self.samples[:]
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+def read_trace(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, _, mx, my, mw, mh, meta_len = TRACE_HEADER.unpack_from(data)
+    if magic != TRACE_MAGIC or version != TRACE_VERSION:
+        raise ValueError(f"{path} is not a version {TRACE_VERSION} trace file")
+    start = TRACE_HEADER.size + meta_len
+    meta = json.loads(data[TRACE_HEADER.size:start])
+    samples = array("d")
+    samples.frombytes(data[start:start + (len(data) - start) // 24 * 24])
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return (mx, my, mw, mh), meta, samples
+
+def replay_trace(args):
+    monitor, meta, samples = read_trace(args.replay)
+    _, _, monitor_w, monitor_h = monitor
+    count = len(samples) // 3
+    if not count:
+        print(f"Trace {args.replay} has no samples")
+        return
+
+    duration = samples[-3] - samples[0]
+    print(f"Replaying {count} samples ({duration:.1f}s) recorded on a {monitor_w}x{monitor_h} monitor")
+    print(f"Recorded with: factor={meta.get("factor")}, minstep={meta.get("minstep")}, maxstep={meta.get("maxstep")}, "
+          f"rows={meta.get("rows")}, columns={meta.get("columns")}, padding={meta.get("padding")}, zoom={meta.get("zoom")}")
+    transport = create_transport(args)
+    print(f"Sending to {", ".join(t.name for t in transport.targets)}, speed={"max" if args.replay_speed <= 0 else args.replay_speed}")
+
+    follower = Follower(args, monitor_w, monitor_h, samples[1], samples[2])
+    policy = SendPolicy(args.delay / 1000.0, heartbeat=args.heartbeat / 1000.0)
+    output = TraceWriter(args.replay_output, monitor, args) if args.replay_output else None
+
+    t0 = samples[0]
+    start = time.monotonic()
+    try:
+        for i in range(0, count * 3, 3):
+            t = samples[i]
+            if args.replay_speed > 0:
+                wait = start + (t - t0) / args.replay_speed - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+
+            x, y = follower.step(samples[i + 1], samples[i + 2], t)
+            if output:
+                output.add(t, x, y)
+            if policy.should_send(int(x), int(y), t):
+                transport.send(x, y, t)
+            else:
+                transport.flush(t)
+    except KeyboardInterrupt:
+        print("\nReplay stopped.")
+    finally:
+        elapsed = time.monotonic() - start
+        print(f"Processed {follower.c} samples in {elapsed:.3f}s ({follower.c / elapsed if elapsed > 0 else 0:.0f} ticks/s)")
+        print(policy.summary())
+        transport.close()
+        if output:
+            output.close()
+            print(f"Output written to:\n> {args.replay_output}")
+
+def read_monitors():
+    from screeninfo import get_monitors
+    return [(m.x, m.y, m.width, m.height) for m in get_monitors()]
+
+class MonitorLayout:
+    # Cached monitor geometry. A background thread re-reads it every refresh_interval seconds, so
+    # rearranged or hotplugged monitors are picked up without a restart and without any cost per tick.
+    # find() uses a fixed grid of buckets over the desktop, so the lookup cost does not depend on the
+    # number of monitors.
+    BUCKETS = 16
+
+    def __init__(self, refresh_interval=2.0, reader=read_monitors):
+        self.reader = reader
+        self.refresh_interval = refresh_interval
+        self.version = 0
+        self.build(reader())
+        if refresh_interval > 0:
+            threading.Thread(target=self._run, name="monitor-layout", daemon=True).start()
+
+    def build(self, monitors):
+        if monitors:
+            left = min(m[0] for m in monitors)
+            top = min(m[1] for m in monitors)
+            bucket_w = (max(m[0] + m[2] for m in monitors) - left) / self.BUCKETS or 1
+            bucket_h = (max(m[1] + m[3] for m in monitors) - top) / self.BUCKETS or 1
+        else:
+            left = top = 0
+            bucket_w = bucket_h = 1
+
+        # Every bucket lists the monitors that overlap it, usually one or two
+        buckets = []
+        for row in range(self.BUCKETS):
+            y0 = top + row * bucket_h
+            for col in range(self.BUCKETS):
+                x0 = left + col * bucket_w
+                buckets.append(tuple(
+                    i for i, (mx, my, mw, mh) in enumerate(monitors)
+                    if mx < x0 + bucket_w and x0 < mx + mw and my < y0 + bucket_h and y0 < my + mh
+                ))
+
+        # Swapped in one assignment, readers always see a consistent layout
+        self.state = (monitors, buckets, left, top, bucket_w, bucket_h)
+        self.version += 1
+
+    def _run(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                monitors = self.reader()
+            except Exception as e:
+                print(f"Monitor layout check failed: {e}")
+                continue
+            if monitors != self.state[0]:
+                print(f"Monitor layout changed, now {len(monitors)} monitor(s)")
+                self.build(monitors)
+
+    def area(self, index):
+        monitors = self.state[0]
+        if 0 <= index < len(monitors):
+            return monitors[index]
+        return None
+
+    def find(self, x, y, hint=-1):
+        monitors, buckets, left, top, bucket_w, bucket_h = self.state
+        if 0 <= hint < len(monitors):
+            mx, my, mw, mh = monitors[hint]
+            if mx <= x < mx + mw and my <= y < my + mh:
+                return hint
+
+        col = int((x - left) / bucket_w)
+        row = int((y - top) / bucket_h)
+        if 0 <= col < self.BUCKETS and 0 <= row < self.BUCKETS:
+            for i in buckets[row * self.BUCKETS + col]:
+                mx, my, mw, mh = monitors[i]
+                if mx <= x < mx + mw and my <= y < my + mh:
+                    return i
+
+        # In a gap between monitors, stay where we are
+        return hint
+
+class PyAutoGUIBackend:
+    # Polls the cursor on every call, works on every platform pyautogui supports
+    name = "pyautogui"
+    blocking = True
+
+    def __init__(self):
+        import pyautogui
+        self._position = pyautogui.position
+
+    def position(self):
+        return self._position()
+
+    def close(self):
+        pass
+
+class XInputBackend:
+    # Listens for XInput2 raw motion events in a background thread and keeps the latest position.
+    # Reading the position is a plain attribute read, there is no X server round-trip per tick.
+    name = "xinput"
+    blocking = False
+
+    def __init__(self):
+        from Xlib import display
+        from Xlib.ext import xinput
+
+        self.display = display.Display()
+        if not self.display.has_extension("XInputExtension"):
+            self.display.close()
+            raise RuntimeError("XInputExtension not available")
+        self.display.xinput_query_version()
+        self.root = self.display.screen().root
+        self.root.xinput_select_events([(xinput.AllMasterDevices, xinput.RawMotionMask)])
+        self.display.flush()
+
+        pointer = self.root.query_pointer()
+        self.latest = (pointer.root_x, pointer.root_y)
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="xinput-listener", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        fd = self.display.fileno()
+        try:
+            while self.running:
+                if not self.display.pending_events():
+                    select.select([fd], [], [], 0.25)
+                    if not self.display.pending_events():
+                        continue
+                # Drop everything that queued up, one position query covers all of it
+                while self.display.pending_events():
+                    self.display.next_event()
+                pointer = self.root.query_pointer()
+                self.latest = (pointer.root_x, pointer.root_y)
+        except Exception as e:
+            print(f"XInput listener stopped: {e}")
+        finally:
+            self.display.close()
+
+    def position(self):
+        return self.latest
+
+    def close(self):
+        self.running = False
+        self.thread.join(1)
+
+class SyntheticBackend:
+    # Deterministic cursor path for tests and benchmarks, every call advances one step.
+    # Without points it sweeps a figure eight over the monitor and rests every other period.
+    name = "synthetic"
+    blocking = False
+
+    def __init__(self, monitor_x, monitor_y, monitor_w, monitor_h, points=None, period=600):
+        self.area = (monitor_x, monitor_y, monitor_w, monitor_h)
+        self.points = points
+        self.period = period
+        self.step = 0
+
+    def position(self):
+        step = self.step
+        self.step += 1
+        if self.points:
+            return self.points[step % len(self.points)]
+
+        x, y, w, h = self.area
+        phase = step % (self.period * 2)
+        if phase >= self.period:
+            phase = self.period - 1
+        t = phase / self.period * 2 * math.pi
+        return int(x + w * (0.5 + 0.45 * math.sin(t))), int(y + h * (0.5 + 0.45 * math.sin(2 * t)))
+
+    def close(self):
+        pass
+
+class CursorSampler:
+    # Polls a blocking backend on a thread of its own and keeps the newest position in one attribute,
+    # so a slow round-trip to the display server delays the next sample instead of the next packet.
+    def __init__(self, backend, period):
+        self.backend = backend
+        self.name = f"{backend.name} (sampled on a thread)"
+        self.latest = backend.position()
+        self.error = None
+        self.scheduler = TickScheduler(period)
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="cursor-sampler", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while self.running:
+            try:
+                self.latest = self.backend.position()
+            except Exception as e:
+                if str(e) != self.error:
+                    print(f"Cursor sampling failed: {e}")
+                self.error = str(e)
+            self.scheduler.wait()
+
+    def position(self):
+        return self.latest
+
+    def close(self):
+        self.running = False
+        self.thread.join(1)
+        self.backend.close()
+
+INPUT_BACKENDS = ["auto", "xinput", "pyautogui", "synthetic"]
+
+def create_input_backend(name, monitor_x, monitor_y, monitor_w, monitor_h):
+    if name == "synthetic":
+        return SyntheticBackend(monitor_x, monitor_y, monitor_w, monitor_h)
+    if name == "pyautogui":
+        return PyAutoGUIBackend()
+
+    if name == "xinput" or (platform.system() == "Linux" and os.environ.get("DISPLAY")):
+        try:
+            return XInputBackend()
+        except Exception as e:
+            print(f"Warning: XInput backend not available ({e}), falling back to pyautogui")
+    return PyAutoGUIBackend()
 
-def get_mouse_relative_to_monitor(monitor_x, monitor_y, monitor_w, monitor_h):
-    mx, my = pyautogui.position()
+def get_mouse_relative_to_monitor(backend, monitor_x, monitor_y, monitor_w, monitor_h):
+    mx, my = backend.position()
     rx = clamp(mx - monitor_x, 0, monitor_w)
     ry = clamp(my - monitor_y, 0, monitor_h)
     return rx, ry
@@ -325,7 +1882,365 @@ def get_snap_target_with_padding(
 
     return (new_col, new_row), ((new_col + 0.5) * cell_w, (new_row + 0.5) * cell_h)
 
-def is_zoomed_in(obs_client, source_name, w, h, crop_filter_name="obs-zoom-to-mouse-crop"):
+class RegionMap:
+    # Snap regions compiled once: bounds, padded hysteresis zones and snap targets live in flat arrays
+    # (4 or 2 values per region), and a grid of buckets lists the regions overlapping each bucket, so a
+    # lookup only tests a few regions even for hundreds of them. Where regions overlap the first one wins.
+    __slots__ = ("count", "bounds", "zones", "centers", "names", "buckets",
+                 "origin_x", "origin_y", "bucket_w", "bucket_h", "cols", "rows")
+
+    def __init__(self, rects, paddings, centers=None, names=None, cols=0, rows=0):
+        count = len(rects)
+        self.count = count
+        self.names = names or [str(i) for i in range(count)]
+        self.bounds = array("d")
+        self.zones = array("d")
+        self.centers = array("d")
+        for i, (x, y, w, h) in enumerate(rects):
+            pad_x = w * paddings[i]
+            pad_y = h * paddings[i]
+            self.bounds.extend((x, y, x + w, y + h))
+            self.zones.extend((x - pad_x, y - pad_y, x + w + pad_x, y + h + pad_y))
+            if centers:
+                self.centers.extend(centers[i])
+            else:
+                self.centers.extend((x + w / 2, y + h / 2))
+
+        # A uniform grid is its own index, one region per bucket
+        if cols <= 0 or rows <= 0:
+            cols = rows = clamp(math.ceil(math.sqrt(count)) * 2, 1, 64)
+        self.cols = cols
+        self.rows = rows
+        if count:
+            self.origin_x = min(self.bounds[0::4])
+            self.origin_y = min(self.bounds[1::4])
+            self.bucket_w = (max(self.bounds[2::4]) - self.origin_x) / cols or 1
+            self.bucket_h = (max(self.bounds[3::4]) - self.origin_y) / rows or 1
+        else:
+            self.origin_x = self.origin_y = 0
+            self.bucket_w = self.bucket_h = 1
+
+        # Every region goes into the buckets it overlaps, in order so the first region still wins
+        buckets = [[] for _ in range(cols * rows)]
+        b = self.bounds
+        for i in range(count):
+            left, top, right, bottom = b[i * 4:i * 4 + 4]
+            first_col = clamp(int((left - self.origin_x) / self.bucket_w), 0, cols - 1)
+            last_col = clamp(math.ceil((right - self.origin_x) / self.bucket_w) - 1, first_col, cols - 1)
+            first_row = clamp(int((top - self.origin_y) / self.bucket_h), 0, rows - 1)
+            last_row = clamp(math.ceil((bottom - self.origin_y) / self.bucket_h) - 1, first_row, rows - 1)
+            for row in range(first_row, last_row + 1):
+                for col in range(first_col, last_col + 1):
+                    buckets[row * cols + col].append(i)
+        self.buckets = [tuple(bucket) for bucket in buckets]
+
+    @classmethod
+    def from_grid(cls, w, h, cols, rows, padding):
+        cell_w = w / cols
+        cell_h = h / rows
+        rects = []
+        centers = []
+        for row in range(rows):
+            for col in range(cols):
+                # The last column and row end exactly on the edge, the cursor is clamped to it
+                left = col * cell_w
+                top = row * cell_h
+                right = w if col == cols - 1 else left + cell_w
+                bottom = h if row == rows - 1 else top + cell_h
+                rects.append((left, top, right - left, bottom - top))
+                centers.append(((col + 0.5) * cell_w, (row + 0.5) * cell_h))
+        names = [f"{col},{row}" for row in range(rows) for col in range(cols)]
+        return cls(rects, [padding] * len(rects), centers, names, cols, rows)
+
+    @classmethod
+    def from_regions(cls, regions, w, h, padding):
+        # Scales what read_regions parsed to a monitor, padding is used where the file sets none
+        relative, file_padding, entries = regions
+        scale_x, scale_y = (w, h) if relative else (1, 1)
+        default_padding = padding if file_padding is None else file_padding
+
+        rects, paddings, centers, names = [], [], [], []
+        for x, y, region_w, region_h, region_padding, target, name in entries:
+            rect = (x * scale_x, y * scale_y, region_w * scale_x, region_h * scale_y)
+            rects.append(rect)
+            paddings.append(default_padding if region_padding is None else region_padding)
+            if target:
+                centers.append((target[0] * scale_x, target[1] * scale_y))
+            else:
+                centers.append((rect[0] + rect[2] / 2, rect[1] + rect[3] / 2))
+            names.append(name)
+        return cls(rects, paddings, centers, names)
+
+    def locate(self, x, y):
+        cols = self.cols
+        col = int((x - self.origin_x) / self.bucket_w)
+        row = int((y - self.origin_y) / self.bucket_h)
+        if col < 0:
+            col = 0
+        elif col >= cols:
+            col = cols - 1
+        if row < 0:
+            row = 0
+        elif row >= self.rows:
+            row = self.rows - 1
+        b = self.bounds
+        for i in self.buckets[row * cols + col]:
+            j = i * 4
+            if b[j] <= x <= b[j + 2] and b[j + 1] <= y <= b[j + 3]:
+                return i
+        return None
+
+    def snap(self, x, y, current=None):
+        # Stay in the current region until the cursor leaves its padded zone
+        if current is not None:
+            z = self.zones
+            j = current * 4
+            if z[j] <= x <= z[j + 2] and z[j + 1] <= y <= z[j + 3]:
+                return current
+        return self.locate(x, y)
+
+def read_regions(path):
+    # {"relative": false, "padding": 0.2, "regions": [{"name": "chat", "x": 0, "y": 0, "w": 480, "h": 1080,
+    #  "padding": 0.1, "target": [240, 700]}, ...]}; relative coordinates are fractions of the monitor.
+    # Returns (relative, padding, regions) with (x, y, w, h, padding, target, name) per region, unscaled.
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Could not read the regions file {path}: {e}")
+    if isinstance(data, list):
+        data = {"regions": data}
+    if not isinstance(data, dict) or not isinstance(data.get("regions", []), list):
+        raise ValueError(f"{path} needs a list of regions")
+
+    regions = []
+    for i, region in enumerate(data.get("regions", [])):
+        try:
+            rect = (float(region["x"]), float(region["y"]), float(region["w"]), float(region["h"]))
+            padding = region.get("padding")
+            target = region.get("target")
+            if target:
+                target = (float(target[0]), float(target[1]))
+        except (KeyError, TypeError, ValueError, IndexError, AttributeError):
+            raise ValueError(f"Region {i} in {path} needs x, y, w and h (and a target of two numbers)")
+        regions.append((*rect, padding, target, str(region.get("name", i))))
+    return data.get("relative", False), data.get("padding"), regions
+
+# Settings that can be changed at runtime with a "NAME VALUE" control command
+LIVE_SETTINGS = {
+    "factor": float,
+    "minstep": float,
+    "maxstep": float,
+    "padding": float,
+    "zoom": float,
+    "rows": int,
+    "columns": int,
+    "delay": int,
+    "heartbeat": int,
+    "predict": float,
+    "jitter_cutoff": float,
+    "jitter_beta": float,
+    "fps_phase": float,
+}
+
+def parse_command(line):
+    parts = line.strip().split()
+    if not parts:
+        return None
+    return parts[0].lower(), parts[1:]
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+INOTIFY_EVENT = struct.Struct("iIII")
+
+class ControlChannel:
+    # Collects control commands from stdin, the keyfile and an optional control socket.
+    # Everything is watched with a single select(); the keyfile is only opened after
+    # inotify reports a write (or, without inotify, after its modification time changed).
+    # start() polls on a thread of its own, so terminal and file I/O never delay a tick.
+    def __init__(self, keyfile_path=None, control=None, use_stdin=True):
+        self.keyfile_path = keyfile_path
+        self.use_stdin = use_stdin
+        self.is_unix = platform.system() != "Windows"
+        self.sock = None
+        self.sock_path = None
+        self.inotify_fd = None
+        self.keyfile_pending = bool(keyfile_path)
+        self.keyfile_mtime = None
+        self.keyfile_checked = 0.0
+        self.thread = None
+        self.running = False
+
+        if control:
+            try:
+                self.open_socket(control)
+            except OSError as e:
+                print(f"Warning: Could not open control socket {control}: {e}")
+                self.sock = None
+
+        if keyfile_path and platform.system() == "Linux":
+            try:
+                self.inotify_fd = self.open_inotify(os.path.dirname(keyfile_path))
+            except OSError as e:
+                print(f"Warning: inotify not available, checking the keyfile modification time instead: {e}")
+
+        self.fds = []
+        if use_stdin and self.is_unix:
+            self.fds.append(sys.stdin)
+        if self.sock:
+            self.fds.append(self.sock)
+        if self.inotify_fd is not None:
+            self.fds.append(self.inotify_fd)
+
+    def open_socket(self, control):
+        if control.isdigit():
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.bind(("127.0.0.1", int(control)))
+            self.address = f"udp://127.0.0.1:{control}"
+        else:
+            self.sock_path = resolve_config_path(control)
+            if os.path.exists(self.sock_path):
+                os.remove(self.sock_path)
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self.sock.bind(self.sock_path)
+            self.address = self.sock_path
+        self.sock.setblocking(False)
+
+    def open_inotify(self, directory):
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Watch the folder, so writers that replace the file are seen as well
+        if libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, f"inotify_add_watch failed for {directory}")
+        return fd
+
+    def read_inotify(self):
+        name = os.fsencode(os.path.basename(self.keyfile_path))
+        try:
+            data = os.read(self.inotify_fd, 4096)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            _, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            if data[offset:offset + length].rstrip(b"\0") == name:
+                self.keyfile_pending = True
+            offset += length
+
+    def keyfile_changed(self, now):
+        # Fallback without inotify: a cheap stat a few times per second
+        if now - self.keyfile_checked < 0.25:
+            return False
+        self.keyfile_checked = now
+        try:
+            mtime = os.stat(self.keyfile_path).st_mtime_ns
+        except OSError:
+            return False
+        changed = mtime != self.keyfile_mtime
+        self.keyfile_mtime = mtime
+        return changed
+
+    def read_keyfile(self):
+        try:
+            with open(self.keyfile_path, "r+") as f:
+                data = f.read()
+                if data:
+                    f.seek(0); f.truncate()
+        except FileNotFoundError:
+            return ""
+        except Exception as e:
+            print(f"Keyfile I/O error: {e}")
+            return ""
+        if self.inotify_fd is not None:
+            # Our own truncate is a write as well, drop that event
+            self.read_inotify()
+            self.keyfile_pending = False
+        return data
+
+    def poll(self, timeout=0):
+        lines = []
+
+        if self.fds:
+            for ready in select.select(self.fds, [], [], timeout)[0]:
+                if ready is sys.stdin:
+                    lines.append(sys.stdin.read(1))
+                elif ready is self.sock:
+                    try:
+                        while True:
+                            data = self.sock.recv(4096)
+                            lines.extend(data.decode(errors="replace").splitlines())
+                    except (BlockingIOError, InterruptedError):
+                        pass
+                else:
+                    self.read_inotify()
+
+        if self.use_stdin and not self.is_unix and msvcrt.kbhit():
+            lines.append(msvcrt.getwch())
+
+        if self.keyfile_path and self.inotify_fd is None and self.keyfile_changed(time.monotonic()):
+            self.keyfile_pending = True
+        if self.keyfile_pending:
+            self.keyfile_pending = False
+            lines.extend(self.read_keyfile().splitlines())
+
+        commands = []
+        for line in lines:
+            command = parse_command(line)
+            if command:
+                commands.append(command)
+        return commands
+
+    def start(self, handle, timeout=0.05):
+        # handle(name, values) runs on the control thread
+        self.running = True
+        self.thread = threading.Thread(target=self._run, args=(handle, timeout), name="control", daemon=True)
+        self.thread.start()
+
+    def _run(self, handle, timeout):
+        while self.running:
+            if not self.fds:
+                # Nothing to select on (Windows console, keyfile without inotify), poll at the timeout
+                time.sleep(timeout)
+            try:
+                for name, values in self.poll(timeout):
+                    handle(name, values)
+            except Exception as e:
+                print(f"Control command error: {e}")
+
+    def close(self):
+        if self.thread:
+            self.running = False
+            self.thread.join(1)
+        if self.sock:
+            self.sock.close()
+            if self.sock_path and os.path.exists(self.sock_path):
+                os.remove(self.sock_path)
+        if self.inotify_fd is not None:
+            os.close(self.inotify_fd)
+
+CROP_FILTER_NAME = "obs-zoom-to-mouse-crop"
+
+def crop_is_zoomed(crop, w, h):
+    crop_cx = crop.get("cx", 0)
+    crop_cy = crop.get("cy", 0)
+    crop_left = crop.get("left", 0)
+    crop_top = crop.get("top", 0)
+
+    # Consider "zoomed" if:
+    # - crop has an offset
+    # - or dimensions smaller than source
+    # Allow 1px tolerance for floating point rounding
+    return (
+        crop_left > 0 or crop_top > 0 or
+        crop_cx < w - 1 or crop_cy < h - 1
+    )
+
+def is_zoomed_in(obs_client, source_name, w, h, crop_filter_name=CROP_FILTER_NAME):
     if not source_name:
         print("source_name not set use the argument --source-name NAME, to detect the zoom-state")
         return None
@@ -339,56 +2254,231 @@ def is_zoomed_in(obs_client, source_name, w, h, crop_filter_name="obs-zoom-to-mo
             print("Error: filter_settings not found in filter response.")
             return None
 
-        crop = filter_resp.filter_settings
-        crop_cx = crop.get("cx", 0)
-        crop_cy = crop.get("cy", 0)
-        crop_left = crop.get("left", 0)
-        crop_top = crop.get("top", 0)
-
         # Get original source size
-        source_w, source_h = w, h
-        if source_w is None or source_h is None:
+        if w is None or h is None:
             print("Could not determine source base size.")
             return None
 
-        # Consider "zoomed" if:
-        # - crop has an offset
-        # - or dimensions smaller than source
-        # Allow 1px tolerance for floating point rounding
-        zoomed = (
-            crop_left > 0 or crop_top > 0 or
-            crop_cx < w - 1 or crop_cy < h - 1
-        )
-
-        return zoomed
+        return crop_is_zoomed(filter_resp.filter_settings, w, h)
 
     except Exception as e:
         print(f"Error checking zoom state: {e}")
         return None
 
+def read_video_fps(obs_client):
+    try:
+        settings = obs_client.send("GetVideoSettings")
+        return settings.fps_numerator / settings.fps_denominator
+    except Exception as e:
+        print(f"Error reading the OBS frame rate: {e}")
+        return None
+
+class ZoomController:
+    # Keeps the zoom state of the crop filter cached and triggers the OBS zoom hotkeys from a worker thread.
+    # The cache follows SourceFilterSettingsChanged events, without them it is refreshed every ttl seconds.
+    # Key presses only record the wanted state, so several presses before the worker runs become one request.
+    # With zoomtoggle and an unknown state a key press still sends the toggle, only the startup request is skipped.
+    # The worker connects first (connect returns the request and event client), streaming does not wait for OBS.
+    # With read_fps the canvas frame rate is read right after connecting, fps stays 0 when that failed.
+    def __init__(self, connect, source_name, w, h, zoomtoggle=False, key="x", ttl=5.0, stats=None, read_fps=False):
+        self.connect = connect
+        self.read_fps = read_fps
+        self.fps = None
+        self.obs_client = None
+        self.event_client = None
+        self.stats = stats
+        self.source_name = source_name
+        self.w = w
+        self.h = h
+        self.zoomtoggle = zoomtoggle
+        self.key = key
+        self.ttl = ttl
+        self.state = None
+        self.state_time = 0.0
+        self.assumed = None
+        self.wanted = None
+        self.pressed = False
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.running = True
+
+        self.thread = threading.Thread(target=self._run, name="zoom-worker", daemon=True)
+        self.thread.start()
+
+    def start(self):
+        try:
+            self.obs_client, self.event_client = self.connect()
+        except Exception as e:
+            print(f"Warning: Could not connect to OBS WebSocket: {e}")
+            return False
+
+        if self.event_client:
+            self.event_client.callback.register(self.on_source_filter_settings_changed)
+
+        if self.read_fps:
+            self.fps = read_video_fps(self.obs_client) or 0
+
+        self.refresh()
+        if self.state is not None:
+            print(f"In your obs setup the zoom-state can be detected, it is {"Zoomed" if self.state else "Unzoomed"}")
+        else:
+            print(f"In your obs setup the zoom-state can't be detected, please make shure the correct --source-name arg is given")
+        return True
+
+    def on_source_filter_settings_changed(self, data):
+        if data.source_name == self.source_name and data.filter_name == CROP_FILTER_NAME:
+            self.state = crop_is_zoomed(data.filter_settings, self.w, self.h)
+            self.state_time = time.monotonic()
+
+    def refresh(self):
+        if self.source_name:
+            start = time.perf_counter()
+            self.state = is_zoomed_in(self.obs_client, self.source_name, self.w, self.h)
+            if self.stats:
+                self.stats.ws.observe(time.perf_counter() - start)
+        self.state_time = time.monotonic()
+
+    def current(self):
+        if self.state is None or time.monotonic() - self.state_time > self.ttl:
+            self.refresh()
+        return self.state
+
+    def request(self, zoomin, pressed=True):
+        with self.lock:
+            self.wanted = zoomin
+            self.pressed = self.pressed or pressed
+        self.wake.set()
+
+    def toggle(self):
+        with self.lock:
+            if self.wanted is not None:
+                base = self.wanted
+            elif self.state is not None:
+                base = self.state
+            else:
+                base = bool(self.assumed)
+            self.wanted = not base
+            self.pressed = True
+        self.wake.set()
+
+    def _run(self):
+        if not self.start():
+            self.running = False
+            return
+
+        while self.running:
+            if not self.wake.wait(self.ttl):
+                # Without events poll the filter, but not once it failed (like a wrong source name), key presses retry
+                if not self.event_client and self.state is not None:
+                    self.refresh()
+                continue
+            self.wake.clear()
+            with self.lock:
+                wanted = self.wanted
+                pressed = self.pressed
+                self.wanted = None
+                self.pressed = False
+            if wanted is not None and self.running:
+                self.apply(wanted, pressed)
+
+    def apply(self, zoomin, pressed=False):
+        state = self.current()
+        known = state if state is not None else self.assumed
+        if known is not None and known == zoomin:
+            print(f"[{self.key}] Zoom-state is already correct, skipped obs hotkey trigger")
+            return
+
+        if state is not None or (self.zoomtoggle and (self.assumed is not None or pressed)):
+            hotkey_name = "toggle_zoom_hotkey"
+        elif self.zoomtoggle:
+            print(f"[{self.key}] Zoom-state is unknown, skipped obs toggle hotkey trigger")
+            return
+        elif zoomin:
+            hotkey_name = "zoom_in_hotkey"
+        else:
+            hotkey_name = "zoom_out_hotkey"
+
+        start = time.perf_counter()
+        try:
+            self.obs_client.send("TriggerHotkeyByName", {
+                "hotkeyName": hotkey_name
+            }, raw=True)
+        except Exception as e:
+            print(f"OBS hotkey error: {e}")
+            return
+        finally:
+            if self.stats:
+                self.stats.ws.observe(time.perf_counter() - start)
+
+        self.assumed = zoomin
+        if state is not None:
+            # The filter only reaches the new state after the zoom animation, don't trust it until then
+            self.state = zoomin
+            self.state_time = time.monotonic()
+
+        if hotkey_name == "toggle_zoom_hotkey":
+            print(f"[{self.key}] Zoom toggle hotkey was triggered, We are now: {"Zoomed" if zoomin else "Unzoomed"}")
+        else:
+            print(f"[{self.key}] Zoom {"in" if zoomin else "out"} hotkey triggered, We are now: {"Zoomed" if zoomin else "Unzoomed"}")
+
+    def close(self):
+        self.running = False
+        self.wake.set()
+        self.thread.join(1)
+        if self.thread.is_alive() and self.obs_client is None:
+            # Still connecting, nothing to zoom out
+            return
+
+        # Zoom out before leaving, this is the only place the caller waits for OBS
+        if self.obs_client:
+            state = self.current()
+            if state or (state is None and self.assumed):
+                self.apply(False)
+
+        if self.event_client:
+            try:
+                self.event_client.disconnect()
+            except Exception as e:
+                print(f"OBS event client disconnect error: {e}")
+        try:
+            if self.obs_client:
+                self.obs_client.disconnect()
+        except Exception as e:
+            print(f"OBS disconnect error: {e}")
+
 def main():
     args = parse_arguments()
-    host = args.ip
-    port = args.port
+    if args.replay:
+        replay_trace(args)
+        return
+
     wsport = args.wsport
     wspassword = args.wspassword
     delay = args.delay / 1000.0
-    rows = args.rows
-    cols = args.columns
     zoomin = args.zoomin
     zoomtoggle = args.zoomtoggle
     source_name = args.source_name
 
     if args.keyfile:
-        keyfile_path = (
-            os.path.abspath(args.keyfile)
-            if os.path.isabs(args.keyfile)
-            else os.path.join(CONFIG_DIR, args.keyfile)
-        )
+        keyfile_path = resolve_config_path(args.keyfile)
     else:
         keyfile_path = None
 
-    monitor_x, monitor_y, monitor_w, monitor_h = get_monitor_area(args.setmonitor)
+    if args.geometry:
+        layout = MonitorLayout(refresh_interval=0, reader=lambda: list(args.geometry))
+    else:
+        layout = MonitorLayout(refresh_interval=args.monitor_refresh)
+    auto_monitor = args.setmonitor < 0
+    monitor_index = 0 if auto_monitor else args.setmonitor
+    monitor_area = layout.area(monitor_index)
+    if monitor_area is None:
+        raise IndexError(f"Monitor index {monitor_index} out of range")
+    monitor_x, monitor_y, monitor_w, monitor_h = monitor_area
+    layout_version = layout.version
+    try:
+        slot_settings = read_slots(resolve_config_path(args.slots)) if args.slots else None
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
     source_w, source_h = args.source_size
     if source_w < 0:
         source_w = monitor_w
@@ -397,235 +2487,343 @@ def main():
 
     key_follow = "y"
     key_zoom = "x"
+    key_stats = "s"
     print("\n-----------------------------------")
     print(" OBS Zoom Mouse Remote - Python")
     print("-----------------------------------")
-    print(f"Sending to {host}:{port}, delay={args.delay}ms")
-    print(f"Selected monitor: x={monitor_x}, y={monitor_y}, w={monitor_w}, h={monitor_h}")
-    if cols > 0 or rows > 0:
-        print(f"Snapping to grid: {cols} columns x {rows} rows")
+    transport = create_transport(args)
+    print(f"Sending to {", ".join(t.name for t in transport.targets)}, delay={args.delay}ms")
+    if slot_settings:
+        print(f"Driving {len(slot_settings)} slot(s) from:\n> {resolve_config_path(args.slots)}")
+    elif auto_monitor:
+        print(f"Following the cursor across {len(layout.state[0])} monitor(s), the monitor index is sent along")
+    else:
+        print(f"Selected monitor: x={monitor_x}, y={monitor_y}, w={monitor_w}, h={monitor_h}")
+    use_crop = args.crop and not slot_settings and args.zoom > 0
+    if use_crop:
+        print(f"Sending the crop of a {source_w}x{source_h} zoom source at zoom {args.zoom:g}")
+    elif args.crop:
+        print(f"Can't send the crop {"with --slots" if slot_settings else "without a --zoom level"}, sending positions")
+    if args.regions and not slot_settings:
+        print(f"Snapping to the regions in:\n> {resolve_config_path(args.regions)}")
+    elif (args.columns > 0 or args.rows > 0) and not slot_settings:
+        print(f"Snapping to grid: {args.columns} columns x {args.rows} rows")
     print(f"Press [{key_follow}] To toggle following.")
     print(f"Press [{key_zoom}] To toggle obs zoom.")
+    control = ControlChannel(keyfile_path, args.control, use_stdin=sys.stdin.isatty())
     if keyfile_path:
         print(f"You can also save [{key_follow}] or [{key_zoom}] to the following file to toggle it:\n> {keyfile_path}")
+    if control.sock:
+        print(f"Control commands are accepted on:\n> {control.address}")
+    if keyfile_path or control.sock:
+        print(f"Commands: {key_follow}, {key_zoom}, in, out or a setting like \"factor 0.02\" ({", ".join(LIVE_SETTINGS)})")
     print("Press Ctrl+C to quit.\n")
 
 
-    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-
-    current_x, current_y = get_mouse_relative_to_monitor(monitor_x, monitor_y, monitor_w, monitor_h)
+    policy = SendPolicy(
+        delay,
+        heartbeat=args.heartbeat / 1000.0,
+        fast_delay=args.fast_delay / 1000.0 if args.fast_delay >= 0 else -1,
+        fast_speed=args.fast_speed
+    )
+    scheduler = TickScheduler(delay, spin=max(args.spin, 0) / 1000.0)
+
+    def lock_to_fps(fps, origin):
+        # fps_multiple ticks per frame, fast motion can't tick any faster than that
+        period = 1.0 / (fps * args.fps_multiple)
+        policy.delay = period
+        policy.fast_delay = -1
+        scheduler.lock(period, args.fps_phase / 1000.0)
+        if isinstance(backend, CursorSampler):
+            backend.scheduler.period = period
+        print(f"Ticking in step with {fps:g} fps ({origin}): {args.fps_multiple} tick(s) per frame, every {period * 1000:.3f}ms")
+
+    stats = None
+    if args.stats or args.stats_interval > 0 or args.stats_port > 0:
+        stats = Stats()
+
+    backend = create_input_backend(args.input, monitor_x, monitor_y, monitor_w, monitor_h)
+    if backend.blocking:
+        # Sampled as often as the fastest tick (but not in a busy loop), the sender reads the newest position
+        backend = CursorSampler(backend, max(policy.shortest_delay(), 0.001))
+    print(f"Cursor input backend: {backend.name}")
+    if args.fps > 0:
+        lock_to_fps(args.fps, "--fps")
+    slots = None
+    if slot_settings:
+        # Every slot follows the same cursor, one packet per tick carries all of them
+        slots = SlotBatch(args, slot_settings, layout, *backend.position())
+        followers = slots.followers
+        for i, (index, area) in enumerate(zip(slots.indices, slots.areas)):
+            mode = " (follows the cursor across monitors)" if slots.auto[i] else ""
+            print(f"Slot {i}: monitor {index}{mode}, x={area[0]}, y={area[1]}, w={area[2]}, h={area[3]}")
+    else:
+        if auto_monitor:
+            monitor_index = layout.find(*backend.position(), monitor_index)
+            monitor_x, monitor_y, monitor_w, monitor_h = monitor_area = layout.area(monitor_index)
+            transport.monitor = monitor_index
+        current_x, current_y = get_mouse_relative_to_monitor(backend, monitor_x, monitor_y, monitor_w, monitor_h)
+        follower = Follower(args, monitor_w, monitor_h, current_x, current_y)
+        followers = [follower]
+
+    if use_crop:
+        # The monitor and source size are read at every send, they change with the monitor
+        def send_position(x, y, now):
+            transport.send_crop(x, y, crop_rect(x, y, monitor_w, monitor_h, source_w, source_h, args.zoom), now)
+    else:
+        send_position = transport.send
+
+    stats_server = None
+    if stats:
+        stats.attach(policy, scheduler, transport, slots or follower)
+        print("Stats are collected, press [s] for a summary.")
+        if args.stats_port > 0:
+            try:
+                stats_server = stats.serve(args.stats_port)
+                print(f"Stats are served on:\n> http://127.0.0.1:{args.stats_port}/metrics")
+            except OSError as e:
+                print(f"Warning: Could not serve stats on port {args.stats_port}: {e}")
+    next_stats = time.monotonic() + args.stats_interval
+    next_lead = 0.0
+
+    recorder = None
+    if args.record:
+        recorder = TraceWriter(args.record, (monitor_x, monitor_y, monitor_w, monitor_h), args)
+        print(f"Recording raw cursor samples to:\n> {args.record}")
 
     following = True
-    obs_client = None
+    zoom = None
 
-    if OBS_AVAILABLE:
-        try:
+    # Optional OBS WebSocket hotkey toggle, on the first target
+    try:
+        import obsws_python as obs
+    except ImportError:
+        obs = None
+
+    if obs:
+        ws_host = args.ip[0]
+
+        def connect_obs():
             obs_client = obs.ReqClient(
-                host=host,
+                host=ws_host,
                 port=wsport,
                 password=wspassword
             )
-        except Exception as e:
-            print(f"Warning: Could not connect to OBS WebSocket: {e}")
-            obs_client = None
+            event_client = None
+            if source_name:
+                try:
+                    event_client = obs.EventClient(
+                        host=ws_host,
+                        port=wsport,
+                        password=wspassword,
+                        subs=obs.Subs.FILTERS
+                    )
+                except Exception as e:
+                    print(f"Warning: Could not subscribe to OBS filter events, polling the zoom-state instead: {e}")
+            return obs_client, event_client
+
+        zoom = ZoomController(connect_obs, source_name, source_w, source_h,
+            zoomtoggle=zoomtoggle, key=key_zoom, stats=stats, read_fps=args.fps < 0)
+
+    # The OBS frame rate arrives from the zoom worker once it connected
+    wait_for_fps = zoom is not None and args.fps < 0
+    if wait_for_fps:
+        print("Reading the frame rate from OBS, ticking every --delay ms until then")
+    elif args.fps < 0:
+        print("Can't read the OBS frame rate without obsws-python; ticking every --delay ms")
 
-    c = 0 # For debug printing
-    current_cell = None  # Start with no cell locked
     raw_x = None
     raw_y = None
 
-    is_unix = platform.system() != "Windows"
+    # Keys are only read from a terminal, not when started by a service or a benchmark
+    is_unix = platform.system() != "Windows" and sys.stdin.isatty()
     if is_unix:
         fd = sys.stdin.fileno()
         old_termios = termios.tcgetattr(fd)
         tty.setcbreak(fd)
 
     # if "zoomin is true", "zoom in" else "zoom out"
-    if obs_client:
-        ret_zoomed = is_zoomed_in(obs_client, source_name, source_w, source_h)
-        if ret_zoomed != None:
-            print(f"In your obs setup the zoom-state can be detected, it is {"Zoomed" if ret_zoomed else "Unzoomed"}")
-        else:
-            print(f"In your obs setup the zoom-state can't be detected, please make shure the correct --source-name arg is given")
-
-        if zoomtoggle or ret_zoomed != None:
-            if ret_zoomed and not zoomin:
-                hotkey_name = "toggle_zoom_hotkey"
-            elif ret_zoomed == False and zoomin:
-                hotkey_name = "toggle_zoom_hotkey"
+    if zoom:
+        zoom.request(zoomin, pressed=False)
+
+    # Keys from stdin, the keyfile and the control socket are handled on the control thread.
+    # Changes to state the sender owns are queued and applied by the loop between ticks.
+    changes = deque(maxlen=64)
+
+    def handle_command(name, values):
+        nonlocal following
+        if name == key_follow:
+            following = not following
+            if following:
+                print(f"[{name}] Mouse Follow was toggled and is now: Enabled")
             else:
-                hotkey_name = ""
-        elif zoomin:
-            hotkey_name = "zoom_in_hotkey"
-        else:
-            hotkey_name = "zoom_out_hotkey"
+                print(f"[{name}] Mouse Follow was toggled and is now: Disabled")
 
-        try:
-            if hotkey_name:
-                resp = obs_client.send("TriggerHotkeyByName", {
-                    "hotkeyName": hotkey_name
-                }, raw=True)
-            if hotkey_name == "toggle_zoom_hotkey":
-                m = f", Its now {"Zoomed" if zoomin else "Unzoomed"}"
-                print(f"[{key_zoom}] Zoom toggle hotkey was triggered{m}")
-            elif hotkey_name:
-                print(f"[{key_zoom}] Zoom {"in" if zoomin else "out"} hotkey triggered, We are now: {"Zoomed" if zoomin else "Unzoomed"}")
+        elif name in (key_zoom, "in", "out"):
+            if zoom and zoom.running:
+                # The worker thread talks to OBS
+                if name == key_zoom:
+                    zoom.toggle()
+                else:
+                    zoom.request(name == "in")
             else:
-                print(f"[{key_zoom}] Zoom-state is already correct, skipped obs hotkey trigger")
-        except Exception as e:
-            print(f"OBS hotkey error: {e}")
+                print(f"[{name}] Cant zoom with WebSocket, obs client not avalible")
+
+        elif name in LIVE_SETTINGS and values:
+            try:
+                value = LIVE_SETTINGS[name](values[0])
+            except ValueError:
+                print(f"[{name}] Invalid value: {values[0]}")
+                return
+            changes.append((name, value))
+            print(f"[{name}] Setting changed to: {value}")
+
+        elif name == key_stats:
+            if stats:
+                print(stats.summary())
+            else:
+                print(f"[{name}] Stats are disabled, start with --stats to collect them")
+
+        elif len(name) > 1 or values:
+            print(f"[{name}] Unknown command")
 
-        # at this point "zoomin true" would say we are "zoomed in" otherwise we are "zoomed out"
+    control.start(handle_command)
 
+    started = time.monotonic()
     try:
         while True:
-            c += 1
+            if stats is not None:
+                tick_start = time.perf_counter()
 
             # Get raw mouse relative to selected monitor if follow is active
             if following or raw_x == None or raw_y == None:
-                raw_x, raw_y = get_mouse_relative_to_monitor(monitor_x, monitor_y, monitor_w, monitor_h)
-
-            if cols > 0 and rows > 0:
-                current_cell, (target_x, target_y) = get_snap_target_with_padding(
-                    raw_x, raw_y,
-                    monitor_w, monitor_h,
-                    cols, rows,
-                    current_cell,
-                    padding_percent=args.padding,
-                    c=c
-                )
-            else:
-                target_x, target_y = raw_x, raw_y
-
-            target_x, target_y = clamp_to_visible(0, 0, monitor_w, monitor_h, target_x, target_y, args.zoom)
-
-            # Smooth *towards the target*
-            current_x, current_y = vector_transition(
-                current_x, current_y,
-                target_x, target_y,
-                factor=args.factor,
-                min_step=args.minstep,
-                max_step=args.maxstep
-            )
-
-            if c % 100 == 0:
-                #print(f"x: {current_x:.2f}, y: {current_y:.2f}")
-                #print("Raw:", raw_x, raw_y)
-                #print("SnapTarget:", target_x, target_y)
-                #print("Smoothed:", int(current_x), int(current_y))
-                pass
-
-            # Round for consistent UDP string
-            msg = f"{int(current_x)} {int(current_y)}"
-            client.sendto(msg.encode(), (host, port))
-
-            # 1) Try keyfile:
-            key = None
-            if keyfile_path:
-                try:
-                    with open(keyfile_path, "r+") as f:
-                        c = f.read(1)
-                        if c:
-                            key = c.lower()
-                            f.seek(0); f.truncate()
-                except Exception as e:
-                    print(f"Keyfile I/O error: {e}")
-
-            # 2) Fallback to stdin:
-            if not key and is_unix:
-                if sys.stdin in select.select([sys.stdin], [], [], 0)[0]:
-                    key = sys.stdin.read(1)
-
-            elif not key and not is_unix:
-                if msvcrt.kbhit():
-                    key = msvcrt.getwch().lower()
-
-            if key and isinstance(key, str) and key[0] == key_follow:
-                following = not following
-                if following:
-                    print(f"[{key}] Mouse Follow was toggled and is now: Enabled")
-                else:
-                    print(f"[{key}] Mouse Follow was toggled and is now: Disabled")
-
-            elif key and isinstance(key, str) and key[0] == key_zoom:
-                if obs_client:
-                    # check if we are zoomed in
-                    ret_zoomed = is_zoomed_in(obs_client, source_name, source_w, source_h)
-                    # request the inverted state
-                    if ret_zoomed != None:
-                        zoomin = not bool(ret_zoomed)
+                mouse_x, mouse_y = backend.position()
+
+                if slots is None and (auto_monitor or layout.version != layout_version):
+                    layout_version = layout.version
+                    index = layout.find(mouse_x, mouse_y, monitor_index) if auto_monitor else monitor_index
+                    area = layout.area(index)
+                    if area is not None and (index != monitor_index or area != monitor_area):
+                        monitor_index, monitor_area = index, area
+                        monitor_x, monitor_y, monitor_w, monitor_h = area
+                        follower.set_monitor(monitor_w, monitor_h,
+                            clamp(mouse_x - monitor_x, 0, monitor_w), clamp(mouse_y - monitor_y, 0, monitor_h))
+                        if auto_monitor:
+                            transport.monitor = index
+                        if args.source_size[0] < 0:
+                            source_w = monitor_w
+                        if args.source_size[1] < 0:
+                            source_h = monitor_h
+                        if zoom:
+                            zoom.w, zoom.h = source_w, source_h
+                        print(f"Following monitor {index}: x={monitor_x}, y={monitor_y}, w={monitor_w}, h={monitor_h}")
+
+                raw_x = clamp(mouse_x - monitor_x, 0, monitor_w)
+                raw_y = clamp(mouse_y - monitor_y, 0, monitor_h)
+                if stats is not None:
+                    stats.mouse.observe(time.perf_counter() - tick_start)
+
+            now = time.monotonic()
+            if recorder:
+                recorder.add(now - started, raw_x, raw_y)
+
+            if slots is not None:
+                # Slots clamp the desktop position to their own monitors
+                positions = slots.step(mouse_x, mouse_y, now)
+                if policy.should_send_slots(positions, now):
+                    if stats is not None:
+                        send_start = time.perf_counter()
+                        transport.send_slots(slots.frame, now)
+                        stats.send.observe(time.perf_counter() - send_start)
                     else:
-                        zoomin = not zoomin
-                    if zoomtoggle or ret_zoomed != None:
-                        hotkey_name = "toggle_zoom_hotkey"
-                    elif zoomin:
-                        hotkey_name = "zoom_in_hotkey"
+                        transport.send_slots(slots.frame, now)
+                else:
+                    transport.flush(now)
+            else:
+                current_x, current_y = follower.step(raw_x, raw_y, now)
+
+                # Unchanged (rounded) positions are only sent as heartbeat
+                if policy.should_send(int(current_x), int(current_y), now):
+                    if stats is not None:
+                        send_start = time.perf_counter()
+                        send_position(current_x, current_y, now)
+                        stats.send.observe(time.perf_counter() - send_start)
                     else:
-                        hotkey_name = "zoom_out_hotkey"
+                        send_position(current_x, current_y, now)
+                else:
+                    # Targets that were rate limited still get the newest position
+                    transport.flush(now)
+
+            # Setting changes from the control thread, applied between ticks (to every slot)
+            while changes:
+                name, value = changes.popleft()
+                setattr(args, name, value)
+                for each in followers:
+                    setattr(each.args, name, value)
+                    if name in ("rows", "columns", "padding"):
+                        each.build_regions()
+                    elif name == "predict":
+                        each.build_predictor()
+                    elif name in ("jitter_cutoff", "jitter_beta"):
+                        each.build_jitter_filter()
+                if name == "delay" and scheduler.phase is not None:
+                    print(f"[{name}] Ticks follow the OBS frames, the delay is only used without --fps")
+                elif name == "delay":
+                    policy.delay = max(value, 0) / 1000.0
+                    if isinstance(backend, CursorSampler):
+                        backend.scheduler.period = max(policy.shortest_delay(), 0.001)
+                elif name == "heartbeat":
+                    policy.heartbeat = value / 1000.0
+                elif name == "fps_phase" and scheduler.phase is not None:
+                    scheduler.lock(scheduler.period, value / 1000.0)
+                elif name == "fps_phase" and wait_for_fps:
+                    print(f"[{name}] Used once the OBS frame rate was read")
+                elif name == "fps_phase":
+                    print(f"[{name}] Ticks don't follow the OBS frames, the phase is only used with --fps")
+
+            if wait_for_fps and (zoom.fps is not None or not zoom.running):
+                wait_for_fps = False
+                if zoom.fps:
+                    lock_to_fps(zoom.fps, "from OBS")
+                else:
+                    print("Could not read the OBS frame rate; ticking every --delay ms")
 
-                    try:
-                        resp = obs_client.send("TriggerHotkeyByName", {
-                            "hotkeyName": hotkey_name
-                        }, raw=True)
-                        if zoomtoggle or ret_zoomed != None:
-                            a = f", We are now: {"Zoomed" if zoomin else "Unzoomed"}"
-                            print(f"[{key}] Zoom toggle hotkey was triggered{a}")
-                        else:
-                            print(
-                                f"[{key}] Zoom {"in" if zoomin else "out"} hotkey triggered, We are now: {"Zoomed" if zoomin else "Unzoomed"}"
-                            )
-                    except Exception as e:
-                        print(f"OBS hotkey error: {e}")
+            # The measured latency changes slowly, the lead follows it once per second
+            if now >= next_lead:
+                next_lead = now + 1.0
+                for each in followers:
+                    if each.args.predict < 0 and each.predictor:
+                        each.predictor.lead = auto_predict_lead(policy.delay, transport.latency)
 
-                else:
-                    print(f"[{key}] Cant zoom with WebSocket, obs client not avalible")
+            if stats is not None:
+                stats.tick.observe(time.perf_counter() - tick_start)
+                if args.stats_interval > 0 and now >= next_stats:
+                    next_stats = now + args.stats_interval
+                    print(stats.summary())
 
-            if delay > 0:
-                time.sleep(delay)
+            scheduler.period = policy.next_delay()
+            scheduler.wait()
 
     except KeyboardInterrupt:
         print("\nDisconnected.")
     except Exception as e:
-        print(f"Unknown socket error: {e}")
+        # Send errors are counted per target, whatever ends up here is a bug
+        print(f"Unexpected error: {e}")
     finally:
-        if obs_client:
-            ret_zoomed = is_zoomed_in(obs_client, source_name, source_w, source_h)
-            if ret_zoomed:
-                zoomin = False
-
-                if zoomtoggle or ret_zoomed != None:
-                    if ret_zoomed and not zoomin:
-                        hotkey_name = "toggle_zoom_hotkey"
-                    elif ret_zoomed == False and zoomin:
-                        hotkey_name = "toggle_zoom_hotkey"
-                    else:
-                        hotkey_name = ""
-                elif zoomin:
-                    hotkey_name = "zoom_in_hotkey"
-                else:
-                    hotkey_name = "zoom_out_hotkey"
-
-                try:
-                    if hotkey_name:
-                        resp = obs_client.send("TriggerHotkeyByName", {
-                            "hotkeyName": hotkey_name
-                        }, raw=True)
-                    if hotkey_name == "toggle_zoom_hotkey":
-                        m = f", Its now {"Zoomed" if zoomin else "Unzoomed"}"
-                        print(f"[{key_zoom}] Zoom toggle hotkey was triggered{m}")
-                    elif hotkey_name:
-                        print(f"[{key_zoom}] Zoom {"in" if zoomin else "out"} hotkey triggered, We are now: {"Zoomed" if zoomin else "Unzoomed"}")
-                    else:
-                        print(f"[{key_zoom}] Zoom-state is already correct, skipped obs hotkey trigger")
-                except Exception as e:
-                    print(f"OBS hotkey error: {e}")
-
-        client.close()
-        try:
-            if obs_client:
-                obs_client.disconnect()
-        except Exception as e:
-            print(f"OBS disconnect error: {e}")
+        if zoom:
+            zoom.close()
+
+        print(policy.summary())
+        print(scheduler.summary())
+        control.close()
+        backend.close()
+        if stats_server:
+            stats_server.shutdown()
+        if recorder:
+            recorder.close()
+            print(f"Recorded {recorder.count} samples to:\n> {args.record}")
+        print(transport.summary())
+        transport.close()
 
         print("\nAll Sockets where closed, exiting.")
 
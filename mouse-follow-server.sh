@@ -13,7 +13,7 @@ source "$venv/bin/activate"
 
 # Install required Python packages
 pip install --upgrade pip
-pip install pyautogui screeninfo obsws-python
+pip install pyautogui screeninfo obsws-python python-xlib
 
 echo ""
 # Run the Python script with all passed arguments
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+
+# Offline tuner for the smoothing and snap settings of mouse-follow-server.py. Feeds a cursor trace
+# (a --record file, CSV or NPY) or synthetic pans, clicks and hand jitter through the follow pipeline
+# for every combination of the given settings, scores them and writes the best one as a config file.
+#
+# The pipeline (grid snap with padding, clamp_to_visible, the vector motion profile over the real
+# elapsed time) is simulated with NumPy across the combinations: every sample is one step over arrays
+# with one entry per combination. The samples depend on each other, the combinations don't, so they
+# are also split across a process pool. The jitter filter and the predictor of the config don't depend
+# on the tuned settings, they run once over the samples with the server's own classes. Other motion
+# profiles are not simulated, the tuner refuses configs that use them.
+
+import argparse
+import importlib.util
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_server():
+    path = os.path.join(ROOT_DIR, "mouse-follow-server.py")
+    spec = importlib.util.spec_from_file_location("mouse_follow_server", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+server = load_server()
+
+# Columns of the settings arrays, one row per combination
+SETTINGS = ("factor", "minstep", "maxstep", "padding", "columns", "rows")
+
+def parse_grid(text):
+    cols, _, rows = text.lower().partition("x")
+    try:
+        return int(cols), int(rows or cols)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected COLSxROWS like 3x2, got {text!r}")
+
+def read_samples(path, delay):
+    # Returns (N, 3) samples of (seconds, x, y) relative to the monitor, the monitor size if the file
+    # knows it and the args it was recorded with
+    if path.lower().endswith(".npy"):
+        data = np.load(path)
+    elif path.lower().endswith((".csv", ".txt")):
+        data = np.genfromtxt(path, delimiter=",", dtype=float)
+        if data.ndim == 2:
+            # A header line reads as NaN
+            data = data[~np.isnan(data).any(axis=1)]
+    else:
+        monitor, meta, samples = server.read_trace(path)
+        return np.frombuffer(samples, dtype=np.float64).reshape(-1, 3), monitor[2:], meta
+
+    if data.ndim != 2 or data.shape[1] not in (2, 3) or not len(data):
+        raise ValueError(f"{path} needs rows of (seconds, x, y) or (x, y)")
+    if data.shape[1] == 2:
+        # No timestamps, one sample per tick
+        data = np.column_stack((np.arange(len(data)) * delay, data))
+    return data.astype(np.float64), None, {}
+
+def synthetic_samples(seconds, monitor_w, monitor_h, delay, tremor, seed):
+    # Quick pans to somewhere else, holds around clicks and slow drifts while reading, plus hand jitter
+    rng = np.random.default_rng(seed)
+    t = np.arange(0.0, seconds, delay)
+    xs = np.empty(len(t))
+    ys = np.empty(len(t))
+    x, y = monitor_w / 2, monitor_h / 2
+    i = 0
+    while i < len(t):
+        kind = rng.choice(3, p=[0.4, 0.35, 0.25])
+        if kind == 0:
+            n = max(int(rng.uniform(0.15, 1.0) / delay), 1)
+            target_x, target_y = rng.uniform(0, monitor_w), rng.uniform(0, monitor_h)
+        elif kind == 1:
+            n = max(int(rng.uniform(0.2, 1.5) / delay), 1)
+            target_x, target_y = x, y
+        else:
+            n = max(int(rng.uniform(1.0, 4.0) / delay), 1)
+            angle = rng.uniform(0, 2 * math.pi)
+            distance = rng.uniform(50, 300)
+            target_x, target_y = x + math.cos(angle) * distance, y + math.sin(angle) * distance
+        s = np.linspace(0.0, 1.0, n + 1)[1:]
+        if kind == 0:
+            s = s * s * (3 - 2 * s)
+        n = min(n, len(t) - i)
+        xs[i:i + n] = x + (target_x - x) * s[:n]
+        ys[i:i + n] = y + (target_y - y) * s[:n]
+        x, y = min(max(xs[i + n - 1], 0), monitor_w), min(max(ys[i + n - 1], 0), monitor_h)
+        i += n
+    xs += rng.normal(0.0, tremor, len(t))
+    ys += rng.normal(0.0, tremor, len(t))
+    return np.column_stack((t, np.clip(xs, 0, monitor_w), np.clip(ys, 0, monitor_h)))
+
+def filter_samples(samples, monitor_w, monitor_h, conf):
+    # The jitter filter and predictor stages of Follower.step with the settings of the config, run once.
+    # Returns the (N, 2) positions the snap and motion stages see, or None when both are off.
+    jitter_cutoff = conf.get("jitter_cutoff", 0.0)
+    predict = conf.get("predict", 0.0)
+    jitter_filter = server.JitterFilter(jitter_cutoff, max(conf.get("jitter_beta", 0.05), 0.0)) if jitter_cutoff > 0 else None
+    if predict > 0:
+        predictor = server.Predictor(predict / 1000.0)
+    elif predict < 0:
+        # Without a receiver there is no measured latency, like the server before the first acknowledgement
+        predictor = server.Predictor(server.auto_predict_lead(conf.get("delay", 10) / 1000.0, None))
+    else:
+        predictor = None
+    if jitter_filter is None and predictor is None:
+        return None
+
+    positions = np.empty((len(samples), 2))
+    for i, (now, x, y) in enumerate(samples.tolist()):
+        if jitter_filter is not None:
+            x, y = jitter_filter.update(x, y, now)
+        if predictor is not None:
+            x, y = predictor.update(x, y, now)
+            x = server.clamp(x, 0, monitor_w)
+            y = server.clamp(y, 0, monitor_h)
+        positions[i] = x, y
+    return positions
+
+def simulate(samples, monitor_w, monitor_h, zoom, settings, positions=None):
+    # The Follower pipeline for an array of settings (one row per combination, see SETTINGS), on the
+    # filtered positions if given. Returns the mean lag (how far the real cursor is outside the zoomed
+    # view, px), the share of samples with the cursor out of view, the jitter (mean change of the
+    # per-sample movement, px) and the cell switches per minute.
+    factor, minstep, maxstep, padding = settings[:, 0], settings[:, 1], settings[:, 2], settings[:, 3]
+    cols = settings[:, 4].astype(np.int64)
+    rows = settings[:, 5].astype(np.int64)
+    count = len(settings)
+    times, raw_x, raw_y = samples[:, 0], samples[:, 1], samples[:, 2]
+    input_x, input_y = (raw_x, raw_y) if positions is None else (positions[:, 0], positions[:, 1])
+    x = np.full(count, input_x[0])
+    y = np.full(count, input_y[0])
+    last_x, last_y = x.copy(), y.copy()
+    before_x, before_y = x.copy(), y.copy()
+    keep = np.maximum(1.0 - factor, 0.0)
+
+    # Combinations without a grid follow the cursor
+    gridded = (cols > 0) & (rows > 0)
+    any_grid = gridded.any()
+    cell_w = monitor_w / np.maximum(cols, 1)
+    cell_h = monitor_h / np.maximum(rows, 1)
+    # Half the size of the padded zone around a cell
+    reach_x = (0.5 + padding) * cell_w
+    reach_y = (0.5 + padding) * cell_h
+    col = np.full(count, -1)
+    row = np.full(count, -1)
+    switches = np.zeros(count, dtype=np.int64)
+
+    half_w = monitor_w / (2 * zoom)
+    half_h = monitor_h / (2 * zoom)
+    lag = np.zeros(count)
+    hidden = np.zeros(count)
+    jitter = np.zeros(count)
+
+    reference = server.MOTION_REFERENCE
+    last = None
+    for i in range(len(times)):
+        px = input_x[i]
+        py = input_y[i]
+
+        if any_grid:
+            # RegionMap.snap: stay in the cell until the cursor leaves its padded zone
+            stay = (col >= 0) & (np.abs(px - (col + 0.5) * cell_w) <= reach_x) & (np.abs(py - (row + 0.5) * cell_h) <= reach_y)
+            new_col = np.minimum(np.maximum((px / cell_w).astype(np.int64), 0), cols - 1)
+            new_row = np.minimum(np.maximum((py / cell_h).astype(np.int64), 0), rows - 1)
+            switches += gridded & ~stay & (col >= 0) & ((col != new_col) | (row != new_row))
+            col = np.where(stay, col, new_col)
+            row = np.where(stay, row, new_row)
+            target_x = np.where(gridded, (col + 0.5) * cell_w, px)
+            target_y = np.where(gridded, (row + 0.5) * cell_h, py)
+        else:
+            target_x, target_y = px, py
+
+        # clamp_to_visible
+        target_x = np.maximum(half_w, np.minimum(target_x, monitor_w - half_w))
+        target_y = np.maximum(half_h, np.minimum(target_y, monitor_h - half_h))
+
+        # MotionEngine.step with vector_transition, in reference sized substeps
+        now = times[i]
+        dt = reference if last is None else min(now - last, server.MOTION_MAX_CATCHUP)
+        last = now
+        if dt > 0:
+            substeps = max(round(dt / reference), 1)
+            scale = dt / substeps / reference
+            rate = 1.0 - keep ** scale
+            low = minstep * scale
+            high = maxstep * scale
+            for _ in range(substeps):
+                dx = target_x - x
+                dy = target_y - y
+                dist = np.hypot(dx, dy)
+                step = np.maximum(low, np.minimum(dist * rate, high))
+                arrived = step >= dist
+                ratio = np.divide(step, dist, out=np.zeros(count), where=~arrived)
+                x = np.where(arrived, target_x, x + dx * ratio)
+                y = np.where(arrived, target_y, y + dy * ratio)
+
+        out = np.hypot(np.maximum(np.abs(raw_x[i] - x) - half_w, 0.0), np.maximum(np.abs(raw_y[i] - y) - half_h, 0.0))
+        lag += out
+        hidden += out > 0
+        if i >= 2:
+            jitter += np.hypot(x - 2 * last_x + before_x, y - 2 * last_y + before_y)
+        before_x, before_y = last_x, last_y
+        last_x, last_y = x, y
+
+    count_samples = len(times)
+    minutes = max((times[-1] - times[0]) / 60, 1e-9)
+    return {
+        "lag": lag / count_samples,
+        "hidden": hidden / count_samples,
+        "jitter": jitter / max(count_samples - 2, 1),
+        "churn": switches / minutes,
+    }
+
+# Set once per worker process, so the samples are not sent along with every task
+worker_state = {}
+
+def init_worker(samples, monitor_w, monitor_h, zoom, positions):
+    worker_state.update(samples=samples, monitor_w=monitor_w, monitor_h=monitor_h, zoom=zoom, positions=positions)
+
+def run_task(settings):
+    s = worker_state
+    return settings, simulate(s["samples"], s["monitor_w"], s["monitor_h"], s["zoom"], settings, s["positions"])
+
+def make_settings(args):
+    # Padding means nothing without a grid
+    combos = []
+    for cols, rows in args.grid:
+        paddings = args.padding if cols > 0 and rows > 0 else args.padding[:1]
+        combos += [
+            (factor, minstep, maxstep, padding, cols, rows)
+            for factor, minstep, maxstep, padding in itertools.product(args.factor, args.minstep, args.maxstep, paddings)
+            if minstep <= maxstep
+        ]
+    return np.array(combos, dtype=np.float64).reshape(-1, len(SETTINGS))
+
+def score(metrics, args):
+    return args.lag_weight * metrics["lag"] + args.jitter_weight * metrics["jitter"] + args.churn_weight * metrics["churn"]
+
+def main():
+    if np is None:
+        print("The tuner needs NumPy, install it with: pip install numpy")
+        sys.exit(1)
+
+    default_config_file = os.path.join(server.CONFIG_DIR, "last_config.json")
+    parser = argparse.ArgumentParser(description="Find smoothing and grid settings for mouse-follow-server.py on a recorded or synthetic cursor trace")
+    parser.add_argument("trace", nargs="?", default=None,
+        help="Trace from --record, or a CSV/NPY file of (seconds, x, y) or (x, y) rows relative to the monitor (default: synthetic)")
+    parser.add_argument("--synthetic", type=float, default=120.0, help="Seconds of synthetic pans, clicks and drifts without a trace (default: 120)")
+    parser.add_argument("--tremor", type=float, default=0.8, help="Hand jitter of the synthetic trace in px (default: 0.8)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the synthetic trace (default: 1)")
+    parser.add_argument("--size", nargs=2, type=int, metavar=("WIDTH", "HEIGHT"), default=None,
+        help="Monitor size for CSV/NPY and synthetic traces (default: 1920 1080)")
+    parser.add_argument("-d", "--delay", type=float, default=10, help="Sample spacing in ms for synthetic traces and (x, y) files (default: 10)")
+    parser.add_argument("-Z", "--zoom", type=float, default=None, help="Zoom factor of the OBS script (default: from the trace or config, else 2)")
+    parser.add_argument("-f", "--factor", type=float, nargs="+", default=[0.005, 0.01, 0.02, 0.04, 0.08])
+    parser.add_argument("-m", "--minstep", type=float, nargs="+", default=[0.5, 1.0, 2.0, 4.0])
+    parser.add_argument("-M", "--maxstep", type=float, nargs="+", default=[25.0, 50.0, 75.0, 150.0])
+    parser.add_argument("-P", "--padding", type=float, nargs="+", default=[0.1, 0.25, 0.45, 0.7])
+    parser.add_argument("--grid", type=parse_grid, nargs="+", default=[(0, 0), (2, 2), (3, 3), (4, 4)],
+        help="Grids to try as COLSxROWS, 0x0 follows the cursor (default: 0x0 2x2 3x3 4x4)")
+    parser.add_argument("--lag-weight", type=float, default=1.0, help="Score per px the cursor is outside the view on average (default: 1)")
+    parser.add_argument("--jitter-weight", type=float, default=20.0, help="Score per px of jitter (default: 20)")
+    parser.add_argument("--churn-weight", type=float, default=1.0, help="Score per cell switch per minute (default: 1)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes (default: all cpus)")
+    parser.add_argument("--top", type=int, default=10, help="Show the N best combinations (default: 10)")
+    parser.add_argument("-c", "--config-file", type=str, default=default_config_file,
+        help=f"Config the tuned settings are merged into (default: {default_config_file})")
+    parser.add_argument("-o", "--output", type=str, default=os.path.join(server.CONFIG_DIR, "tuned_config.json"),
+        help="Where to write the tuned config (default: tuned_config.json in the config dir)")
+    args = parser.parse_args()
+
+    base = server.load_last_config(args.config_file)
+    delay = args.delay / 1000.0
+    if args.trace:
+        samples, size, meta = read_samples(args.trace, delay)
+        print(f"Loaded {len(samples)} samples ({samples[-1, 0] - samples[0, 0]:.1f}s) from:\n> {args.trace}")
+    else:
+        size, meta = None, {}
+        w, h = args.size or (1920, 1080)
+        samples = synthetic_samples(args.synthetic, w, h, delay, args.tremor, args.seed)
+        print(f"Generated {len(samples)} synthetic samples ({args.synthetic:.0f}s, seed {args.seed})")
+    monitor_w, monitor_h = size or args.size or (1920, 1080)
+    zoom = args.zoom if args.zoom is not None else meta.get("zoom", base.get("zoom", 2))
+    if zoom <= 0:
+        print("The tuner needs a zoom factor above 0 (--zoom) to know how much of the monitor is visible")
+        sys.exit(1)
+    motion = base.get("motion", "vector")
+    if motion != "vector":
+        print(f"The config uses --motion {motion}, the tuner only simulates the vector profile; "
+              f"tune a config with --motion vector instead (-c)")
+        sys.exit(1)
+
+    positions = filter_samples(samples, monitor_w, monitor_h, base)
+    if positions is not None:
+        print(f"Simulating the config's jitter_cutoff={base.get("jitter_cutoff", 0.0):g} "
+              f"jitter_beta={base.get("jitter_beta", 0.05):g} predict={base.get("predict", 0.0):g}")
+
+    settings = make_settings(args)
+    total = len(settings)
+    if not total:
+        print("No combinations to try, every --minstep is above every --maxstep")
+        sys.exit(1)
+    # Few large slices, the arrays get cheaper per combination the longer they are
+    jobs = max(min(args.jobs, total), 1)
+    tasks = np.array_split(settings, jobs)
+    print(f"Trying {total} combinations on a {monitor_w}x{monitor_h} monitor at zoom {zoom:g} with {jobs} process(es) ...")
+    start = time.perf_counter()
+    results = []
+    init = (samples, monitor_w, monitor_h, zoom, positions)
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=init) as pool:
+            results = list(pool.map(run_task, tasks))
+    else:
+        init_worker(*init)
+        results = [run_task(task) for task in tasks]
+    elapsed = time.perf_counter() - start
+    print(f"Simulated {total * len(samples)} ticks in {elapsed:.2f}s ({total * len(samples) / elapsed / 1e6:.1f}M ticks/s)\n")
+
+    rows = []
+    for part, metrics in results:
+        scores = score(metrics, args)
+        for k in range(len(part)):
+            combo = dict(zip(SETTINGS, map(float, part[k])))
+            combo["columns"] = int(combo["columns"])
+            combo["rows"] = int(combo["rows"])
+            rows.append((float(scores[k]), combo, {name: float(values[k]) for name, values in metrics.items()}))
+    rows.sort(key=lambda row: row[0])
+
+    # The settings of the config for comparison
+    current = {name: base.get(name, default) for name, default in
+        zip(SETTINGS, (0.01, 2.0, 75.0, 0.45, 0, 0))}
+    metrics = simulate(samples, monitor_w, monitor_h, zoom, np.array([[current[name] for name in SETTINGS]], dtype=np.float64), positions)
+    current_row = (float(score(metrics, args)[0]), current, {name: float(values[0]) for name, values in metrics.items()})
+
+    print(f"{"":>8} {"score":>8} {"lag px":>7} {"hidden":>7} {"jitter":>7} {"churn":>6}   settings")
+    for rank, (value, settings, metrics) in [(i + 1, row) for i, row in enumerate(rows[:args.top])] + [("config", current_row)]:
+        grid = f"{settings["columns"]}x{settings["rows"]}"
+        print(f"{rank:>8} {value:>8.2f} {metrics["lag"]:>7.2f} {metrics["hidden"] * 100:>6.1f}% {metrics["jitter"]:>7.3f} {metrics["churn"]:>6.1f}   "
+              f"factor={settings["factor"]:g} minstep={settings["minstep"]:g} maxstep={settings["maxstep"]:g} "
+              f"padding={settings["padding"]:g} grid={grid}")
+
+    best = rows[0][1]
+    conf = dict(base)
+    conf.update(best)
+    conf["motion"] = "vector"
+    if conf.get("regions"):
+        print(f"\nThe config snaps to --regions {conf["regions"]}, the tuned grid replaces them")
+        conf["regions"] = None
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(conf, f, indent=2)
+    except Exception as e:
+        print(f"Warning: Failed to save the tuned config: {e}")
+        sys.exit(1)
+    print(f"\nTuned config written to:\n> {os.path.abspath(args.output)}")
+    print(f"Use it with: mouse-follow-server.py --config-file {os.path.abspath(args.output)}")
+
+if __name__ == "__main__":
+    main()
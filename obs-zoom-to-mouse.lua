@@ -12,6 +12,8 @@ local CROP_FILTER_NAME = "obs-zoom-to-mouse-crop"
 local socket_available, socket = pcall(require, "ljsocket")
 local socket_server = nil
 local socket_mouse = nil
+local socket_crop = nil
+local socket_wire = nil
 
 local source_name = ""
 local source = nil
@@ -72,6 +74,11 @@ local monitor_override_dh = 0
 local use_socket = false
 local socket_port = 0
 local socket_poll = 1000
+local socket_sources = ""
+local socket_playout = 0
+local socket_slot = 0
+local socket_shm = ""
+local socket_source_list = {}
 local debug_logs = false
 local is_obs_loaded = false
 local is_script_loaded = false
@@ -156,15 +163,209 @@ elseif ffi.os == "OSX" then
     end
 end
 
+-- Binary packets from the remote server (see mouse-follow-server.py), the text format "x y [monitor]" is still accepted
+local WIRE_MAGIC = "OZMR"
+local WIRE_ACK_MAGIC = "OZMA"
+local WIRE_VERSION = 1
+local WIRE_PACKET_SIZE = 32
+local WIRE_SLOTS_HEADER_SIZE = 20
+local WIRE_KIND_POSITION = 0
+local WIRE_KIND_SLOTS = 1
+local WIRE_KIND_CROP = 2
+local WIRE_CROP_PACKET_SIZE = 40
+local WIRE_ACK_SIZE = 16
+local WIRE_STALE_WINDOW = 1024
+local WIRE_NO_MONITOR = 0xFFFFFFFF
+local WIRE_ACK_RECEIVED = 1
+
+-- Remote samples kept for interpolation, and how far past the newest one we may extrapolate (then ease back)
+local SOCKET_RING_SIZE = 32
+local SOCKET_EXTRAPOLATE_US = 50000
+local SOCKET_OFFSET_CREEP_US = 1
+ffi.cdef([[
+    typedef struct {
+        char magic[4];
+        uint8_t version;
+        uint8_t kind;
+        uint16_t slot;
+        int64_t timestamp;
+        uint32_t seq;
+        uint32_t monitor;
+        float x;
+        float y;
+    } ozm_packet;
+
+    typedef struct {
+        char magic[4];
+        uint8_t version;
+        uint8_t flags;
+        uint16_t received;
+        uint32_t seq;
+        float latency;
+    } ozm_ack;
+]])
+
+if ffi.os == "Windows" then
+    ffi.cdef([[
+        typedef struct {
+            uint32_t low;
+            uint32_t high;
+        } ozm_filetime;
+        void GetSystemTimePreciseAsFileTime(ozm_filetime*);
+    ]])
+    local filetime = ffi.new("ozm_filetime[1]")
+
+    ---
+    -- Wall clock time in microseconds since the unix epoch (matches the server timestamps)
+    function wall_time_us()
+        ffi.C.GetSystemTimePreciseAsFileTime(filetime)
+        return (filetime[0].high * 4294967296 + filetime[0].low) / 10 - 11644473600000000
+    end
+else
+    ffi.cdef([[
+        typedef struct {
+            long tv_sec;
+            long tv_nsec;
+        } ozm_timespec;
+        int clock_gettime(int, ozm_timespec*);
+    ]])
+    local timespec = ffi.new("ozm_timespec[1]")
+    local CLOCK_REALTIME = 0
+
+    ---
+    -- Wall clock time in microseconds since the unix epoch (matches the server timestamps)
+    function wall_time_us()
+        ffi.C.clock_gettime(CLOCK_REALTIME, timespec)
+        return tonumber(timespec[0].tv_sec) * 1000000 + tonumber(timespec[0].tv_nsec) / 1000
+    end
+end
+
+-- Shared memory file written by a server on the same machine (see ShmTransport in mouse-follow-server.py):
+-- a header with a seqlock counter that is odd while the server rewrites the packet, then the newest binary packet
+local SHM_MAGIC = "OZMS"
+local SHM_VERSION = 1
+local SHM_HEADER_SIZE = 16
+local SHM_SIZE = 4096
+local SHM_READ_ATTEMPTS = 3
+local SHM_RETRY_NS = 1000000000
+local SHM_ACTIVE_NS = 1000000000
+ffi.cdef([[
+    typedef struct {
+        char magic[4];
+        uint8_t version;
+        uint8_t reserved;
+        uint16_t reserved2;
+        volatile uint32_t lock;
+        volatile uint32_t length;
+    } ozm_shm_header;
+]])
+
+if ffi.os == "Windows" then
+    ffi.cdef([[
+        void* CreateFileA(const char*, uint32_t, uint32_t, void*, uint32_t, uint32_t, void*);
+        uint32_t GetFileSize(void*, uint32_t*);
+        void* CreateFileMappingA(void*, void*, uint32_t, uint32_t, uint32_t, const char*);
+        void* MapViewOfFile(void*, uint32_t, uint32_t, uint32_t, size_t);
+        BOOL UnmapViewOfFile(const void*);
+        BOOL CloseHandle(void*);
+    ]])
+    local INVALID_HANDLE_VALUE = ffi.cast("void*", -1)
+    local GENERIC_READ = 0x80000000
+    local FILE_SHARE_ALL = 7
+    local OPEN_EXISTING = 3
+    local PAGE_READONLY = 2
+    local FILE_MAP_READ = 4
+
+    ---
+    -- Map the shared memory file read-only
+    ---@param path string Path of the file
+    ---@return any|nil Pointer to the mapped file, nil if it does not exist (yet) or is too small
+    function map_shm_file(path)
+        local file = ffi.C.CreateFileA(path, GENERIC_READ, FILE_SHARE_ALL, nil, OPEN_EXISTING, 0, nil)
+        if file == INVALID_HANDLE_VALUE then
+            return nil
+        end
+
+        local view = nil
+        if ffi.C.GetFileSize(file, nil) >= SHM_SIZE then
+            local mapping = ffi.C.CreateFileMappingA(file, nil, PAGE_READONLY, 0, 0, nil)
+            if mapping ~= nil then
+                -- The view keeps the mapping alive
+                view = ffi.C.MapViewOfFile(mapping, FILE_MAP_READ, 0, 0, SHM_SIZE)
+                ffi.C.CloseHandle(mapping)
+            end
+        end
+        ffi.C.CloseHandle(file)
+
+        if view == nil then
+            return nil
+        end
+        return view
+    end
+
+    function unmap_shm_file(view)
+        ffi.C.UnmapViewOfFile(view)
+    end
+else
+    ffi.cdef([[
+        int open(const char*, int, ...);
+        int close(int);
+        int64_t lseek(int, int64_t, int);
+        void* mmap(void*, size_t, int, int, int, int64_t);
+        int munmap(void*, size_t);
+    ]])
+    local MAP_FAILED = ffi.cast("void*", -1)
+    local O_RDONLY = 0
+    local SEEK_END = 2
+    local PROT_READ = 1
+    local MAP_SHARED = 1
+
+    ---
+    -- Map the shared memory file read-only
+    ---@param path string Path of the file
+    ---@return any|nil Pointer to the mapped file, nil if it does not exist (yet) or is too small
+    function map_shm_file(path)
+        local fd = ffi.C.open(path, O_RDONLY)
+        if fd < 0 then
+            return nil
+        end
+
+        -- Reading past the end of a mapped file is a crash, not an error
+        local view = nil
+        if ffi.C.lseek(fd, 0, SEEK_END) >= SHM_SIZE then
+            view = ffi.C.mmap(nil, SHM_SIZE, PROT_READ, MAP_SHARED, fd, 0)
+        end
+        ffi.C.close(fd)
+
+        if view == nil or view == MAP_FAILED then
+            return nil
+        end
+        return view
+    end
+
+    function unmap_shm_file(view)
+        ffi.C.munmap(view, SHM_SIZE)
+    end
+end
+
 ---
 -- Get the current mouse position
 ---@return table Mouse position
 function get_mouse_pos()
     local mouse = { x = 0, y = 0 }
 
+    -- A server on this machine writes into shared memory, read it right when the position is needed
+    if socket_wire ~= nil and socket_wire.shm ~= nil then
+        poll_shm_mouse()
+    end
+
     if socket_mouse ~= nil then
-        mouse.x = socket_mouse.x
-        mouse.y = socket_mouse.y
+        if socket_playout > 0 and socket_wire ~= nil and socket_wire.count > 0 then
+            mouse.x, mouse.y = sample_socket_mouse(render_time_us() - socket_playout * 1000)
+        else
+            mouse.x = socket_mouse.x
+            mouse.y = socket_mouse.y
+        end
     else
         if ffi.os == "Windows" then
             if win_point and ffi.C.GetCursorPos(win_point) ~= 0 then
@@ -754,6 +955,17 @@ function refresh_sceneitem(find_newest)
     end
 end
 
+---
+-- Check if the crop from the server (--crop) can be applied as it is.
+-- The server doesn't know the scale of a cloned source, so a scaled source follows the center of the crop instead
+---@return boolean
+function can_use_socket_crop()
+    if socket_crop == nil then
+        return false
+    end
+    return not (monitor_info and ((monitor_info.scale_x or 1) ~= 1 or (monitor_info.scale_y or 1) ~= 1))
+end
+
 ---
 -- Get the target position that we will attempt to zoom towards
 ---@param zoom any
@@ -761,6 +973,30 @@ end
 function get_target_position(zoom)
     local mouse = get_mouse_pos()
 
+    -- With --crop the server already smoothed the crop, the remote position is its center in pixels of the source
+    -- (--source-size, the size before the crop the source already has)
+    if socket_crop ~= nil then
+        if can_use_socket_crop() then
+            -- Shift it by the crop the source already has, and keep it on the source: the server clamped the newest
+            -- crop, but the playout delay can extrapolate the center past that
+            local center = { x = mouse.x - zoom.source_crop_filter.x, y = mouse.y - zoom.source_crop_filter.y }
+            local crop = {
+                x = clamp(0, zoom.source_size.width - socket_crop.w, center.x - socket_crop.w * 0.5),
+                y = clamp(0, zoom.source_size.height - socket_crop.h, center.y - socket_crop.h * 0.5),
+                w = socket_crop.w,
+                h = socket_crop.h
+            }
+            return { crop = crop, raw_center = center, clamped_center = { x = math.floor(crop.x + crop.w * 0.5), y = math.floor(crop.y + crop.h * 0.5) } }
+        end
+
+        -- A scaled source follows the center like a remote position on the desktop, the server already scaled
+        -- it when --source-size is the scaled size, so undo that before the scale below is applied again
+        if monitor_info then
+            mouse.x = mouse.x / (monitor_info.scale_x or 1) + monitor_info.x
+            mouse.y = mouse.y / (monitor_info.scale_y or 1) + monitor_info.y
+        end
+    end
+
     -- If we have monitor information then we can offset the mouse by the top-left of the monitor position
     -- This is because the display-capture source assumes top-left is 0,0 but the mouse uses the total desktop area,
     -- so a second monitor might start at x:1920, y:0 for example, so when we click at 1920,0 we want it to look like we clicked 0,0 on the source.
@@ -923,6 +1159,17 @@ function on_timer()
                 crop_filter_info.h = lerp(crop_filter_info.h, zoom_target.crop.h, ease_in_out(zoom_time))
                 set_crop_settings(crop_filter_info)
             end
+        elseif is_following_mouse and can_use_socket_crop() then
+            -- The crop from the server is final, there is no follow speed or safe zone left to apply
+            zoom_target = get_target_position(zoom_info)
+            local crop = zoom_target.crop
+            if crop.x ~= crop_filter_info.x or crop.y ~= crop_filter_info.y or crop.w ~= crop_filter_info.w or crop.h ~= crop_filter_info.h then
+                crop_filter_info.x = crop.x
+                crop_filter_info.y = crop.y
+                crop_filter_info.w = crop.w
+                crop_filter_info.h = crop.h
+                set_crop_settings(crop_filter_info)
+            end
         else
             -- If we are not zooming we only move the x/y to follow the mouse (width/height stay constant)
             if is_following_mouse then
@@ -1043,37 +1290,400 @@ function on_timer()
     end
 end
 
+---
+-- Parse one datagram from the remote server
+---@param data string The raw datagram
+---@return table|nil Mouse position of our slot, or nil if the packet is invalid, for another slot or older than one we already used
+function parse_socket_packet(data)
+    if #data >= WIRE_SLOTS_HEADER_SIZE and data:sub(1, 4) == WIRE_MAGIC then
+        -- Position packets and slots packets share the header up to the sequence number
+        local packet = ffi.cast("const ozm_packet*", data)
+        if packet.version ~= WIRE_VERSION then
+            return nil
+        end
+        local kind = packet.kind
+        local count = packet.slot
+        if not ((kind == WIRE_KIND_POSITION and #data == WIRE_PACKET_SIZE) or
+                (kind == WIRE_KIND_SLOTS and #data == WIRE_SLOTS_HEADER_SIZE + 12 * count) or
+                (kind == WIRE_KIND_CROP and #data == WIRE_CROP_PACKET_SIZE)) then
+            return nil
+        end
+        socket_wire.received = socket_wire.received + 1
+
+        -- Drop reordered or duplicated packets, a large jump backwards means the server was restarted
+        local seq = tonumber(packet.seq)
+        if socket_wire.seq ~= nil then
+            local diff = (seq - socket_wire.seq) % 4294967296
+            if diff == 0 or (diff >= 2147483648 and 4294967296 - diff < WIRE_STALE_WINDOW) then
+                socket_wire.dropped = socket_wire.dropped + 1
+                return nil
+            end
+        end
+        socket_wire.seq = seq
+
+        local latency = (wall_time_us() - tonumber(packet.timestamp)) / 1000
+        if socket_wire.latency == nil then
+            socket_wire.latency = latency
+        else
+            socket_wire.latency = socket_wire.latency + (latency - socket_wire.latency) * 0.05
+        end
+
+        local x, y, monitor, crop
+        if kind == WIRE_KIND_POSITION then
+            if packet.slot ~= socket_slot then
+                return { binary = true }
+            end
+            x, y, monitor = packet.x, packet.y, packet.monitor
+        elseif kind == WIRE_KIND_CROP then
+            -- Left and top take the place of x and y, width and height follow; the center is what gets interpolated
+            local size = ffi.cast("const float*", ffi.cast("const uint8_t*", data) + WIRE_PACKET_SIZE)
+            crop = { w = tonumber(size[0]), h = tonumber(size[1]) }
+            x, y, monitor = packet.x + crop.w * 0.5, packet.y + crop.h * 0.5, packet.monitor
+        else
+            -- Monitor indices of all slots, then x and y of all slots
+            if socket_slot >= count then
+                return { binary = true }
+            end
+            local body = ffi.cast("const uint8_t*", data) + WIRE_SLOTS_HEADER_SIZE
+            local positions = ffi.cast("const float*", body + 4 * count)
+            monitor = ffi.cast("const uint32_t*", body)[socket_slot]
+            x, y = positions[socket_slot * 2], positions[socket_slot * 2 + 1]
+        end
+
+        if monitor ~= WIRE_NO_MONITOR then
+            monitor = tonumber(monitor)
+        else
+            monitor = nil
+        end
+
+        return { x = tonumber(x), y = tonumber(y), monitor = monitor, crop = crop, time = tonumber(packet.timestamp), binary = true }
+    end
+
+    -- The text format only carries the first slot
+    local sx, sy, sm = data:match("(-?%d+) (-?%d+) ?(%d*)")
+    if sx and sy and socket_slot == 0 then
+        return { x = tonumber(sx, 10), y = tonumber(sy, 10), monitor = tonumber(sm, 10) }
+    end
+
+    return nil
+end
+
+---
+-- Get the time of the frame OBS is rendering, on the same clock as os_gettime_ns
+---@return number Time in microseconds
+function render_time_us()
+    local frame_time = obs.obs_get_video_frame_time and obs.obs_get_video_frame_time()
+    if frame_time == nil or frame_time == 0 then
+        frame_time = obs.os_gettime_ns()
+    end
+    return frame_time / 1000
+end
+
+---
+-- Add a remote sample to the ring buffer
+---@param arrival number Local time the sample was received (microseconds)
+---@param sample table Parsed sample, binary samples carry the time they were sent
+function push_socket_sample(arrival, sample)
+    local time = arrival
+    if sample.time ~= nil then
+        -- Map the sender clock onto ours with the smallest offset seen, that is the packet with the least delay.
+        -- It creeps up slowly so clock drift is followed, and the send times keep the spacing bunched arrivals lose.
+        local offset = arrival - sample.time
+        if socket_wire.clock_offset == nil or offset < socket_wire.clock_offset + SOCKET_OFFSET_CREEP_US then
+            socket_wire.clock_offset = offset
+        else
+            socket_wire.clock_offset = socket_wire.clock_offset + SOCKET_OFFSET_CREEP_US
+        end
+        time = sample.time + socket_wire.clock_offset
+    end
+
+    local count = socket_wire.count
+    if count > 0 then
+        time = math.max(time, socket_wire.ring_t[(count - 1) % SOCKET_RING_SIZE])
+    end
+    local i = count % SOCKET_RING_SIZE
+    socket_wire.ring_t[i] = time
+    socket_wire.ring_x[i] = sample.x
+    socket_wire.ring_y[i] = sample.y
+    socket_wire.count = count + 1
+end
+
+---
+-- Interpolate the remote cursor at a point in time, or extrapolate a little past the newest sample
+---@param time number Time in microseconds
+---@return number, number Mouse position
+function sample_socket_mouse(time)
+    local count = socket_wire.count
+    local ring_t, ring_x, ring_y = socket_wire.ring_t, socket_wire.ring_x, socket_wire.ring_y
+    local newest = (count - 1) % SOCKET_RING_SIZE
+
+    if time >= ring_t[newest] then
+        if count < 2 then
+            return ring_x[newest], ring_y[newest]
+        end
+        -- Keep moving like the last two samples for a short while, then ease back to the newest sample
+        -- over the same time, so a stop or a lost packet doesn't leave the position overshot until the next one
+        local prev = (count - 2) % SOCKET_RING_SIZE
+        local span = ring_t[newest] - ring_t[prev]
+        local ahead = time - ring_t[newest]
+        if span <= 0 or ahead >= 2 * SOCKET_EXTRAPOLATE_US then
+            return ring_x[newest], ring_y[newest]
+        end
+        if ahead > SOCKET_EXTRAPOLATE_US then
+            ahead = 2 * SOCKET_EXTRAPOLATE_US - ahead
+        end
+        local f = ahead / span
+        return ring_x[newest] + (ring_x[newest] - ring_x[prev]) * f, ring_y[newest] + (ring_y[newest] - ring_y[prev]) * f
+    end
+
+    -- Walk back to the two samples around the time
+    local available = math.min(count, SOCKET_RING_SIZE)
+    for n = 1, available - 1 do
+        local b = (count - n) % SOCKET_RING_SIZE
+        local a = (count - n - 1) % SOCKET_RING_SIZE
+        if ring_t[a] <= time then
+            local span = ring_t[b] - ring_t[a]
+            local f = 1
+            if span > 0 then
+                f = (time - ring_t[a]) / span
+            end
+            return ring_x[a] + (ring_x[b] - ring_x[a]) * f, ring_y[a] + (ring_y[b] - ring_y[a]) * f
+        end
+    end
+
+    local oldest = (count - available) % SOCKET_RING_SIZE
+    return ring_x[oldest], ring_y[oldest]
+end
+
+---
+-- Switch the zoom source to the one configured for the monitor the remote cursor is on
+---@param index number The monitor index sent by the server
+function switch_socket_source(index)
+    local name = socket_source_list[index + 1]
+    if name == nil or name == source_name then
+        return
+    end
+
+    -- Never swap the source out from under a zoom, the crop belongs to the old one
+    if zoom_state ~= ZoomState.None then
+        return
+    end
+
+    log("Remote cursor moved to monitor " .. index .. ", switching to '" .. name .. "'")
+    source_name = name
+    refresh_sceneitem(true)
+    monitor_info = get_monitor_info(source)
+end
+
+---
+-- Split the comma separated list of zoom sources for each remote monitor
+---@param text string The setting value
+---@return table List of source names, the first one is for monitor 0
+function parse_socket_sources(text)
+    local list = {}
+    for name in string.gmatch(text, "([^,]+)") do
+        name = name:match("^%s*(.-)%s*$")
+        if name ~= "" then
+            table.insert(list, name)
+        end
+    end
+    return list
+end
+
+---
+-- Tell the server that we understand binary packets, how much latency we measured and how many packets arrived
+function send_socket_ack()
+    local ack = ffi.new("ozm_ack[1]")
+    ffi.copy(ack[0].magic, WIRE_ACK_MAGIC, 4)
+    ack[0].version = WIRE_VERSION
+    ack[0].flags = WIRE_ACK_RECEIVED
+    ack[0].received = socket_wire.received % 65536
+    ack[0].seq = socket_wire.seq or 0
+    ack[0].latency = socket_wire.latency or -1
+    socket_server:send_to(socket_wire.reply_address, ffi.string(ack, WIRE_ACK_SIZE))
+end
+
+---
+-- Use a sample as the current remote mouse position
+---@param sample table The newest parsed sample
+function set_socket_mouse(sample)
+    if not socket_mouse then
+        log("Socket server client connected")
+        socket_mouse = { x = sample.x, y = sample.y }
+    else
+        socket_mouse.x = sample.x
+        socket_mouse.y = sample.y
+    end
+
+    -- Crop packets carry the size of the crop, its center is the remote position
+    local switched = (sample.crop ~= nil) ~= (socket_crop ~= nil)
+    socket_crop = sample.crop
+    if switched then
+        if socket_crop == nil then
+            log("Following the remote position")
+        elseif can_use_socket_crop() then
+            log("Applying the crop computed by the server")
+        else
+            log("The zoom source is scaled, following the center of the crop computed by the server")
+        end
+        -- Centers on the source and positions on the desktop don't mix
+        socket_wire.count = 0
+        push_socket_sample(obs.os_gettime_ns() / 1000, sample)
+    end
+
+    if sample.monitor ~= nil and is_obs_loaded then
+        switch_socket_source(sample.monitor)
+    end
+end
+
+---
+-- Read the newest packet from the shared memory file, the file is mapped on first use
+---@return string|nil The packet, or nil if there is no new one
+function read_shm_packet()
+    local shm = socket_wire.shm
+    if shm.view == nil then
+        -- The server may be started after OBS, look for the file again every second
+        local now = obs.os_gettime_ns()
+        if now < shm.retry_time then
+            return nil
+        end
+        shm.retry_time = now + SHM_RETRY_NS
+
+        local view = map_shm_file(shm.path)
+        if view == nil then
+            return nil
+        end
+        local header = ffi.cast("const ozm_shm_header*", view)
+        if ffi.string(header.magic, 4) ~= SHM_MAGIC or header.version ~= SHM_VERSION then
+            unmap_shm_file(view)
+            return nil
+        end
+        shm.view = view
+        shm.header = header
+        shm.packet = ffi.cast("const uint8_t*", view) + SHM_HEADER_SIZE
+        log("Reading remote mouse positions from " .. shm.path)
+    end
+
+    -- The packet is only used if the counter was even and unchanged around the copy, otherwise the server
+    -- was writing and we try again. It writes for a few microseconds every tick, so this hardly ever loops.
+    local header = shm.header
+    for _ = 1, SHM_READ_ATTEMPTS do
+        local lock = header.lock
+        if lock == shm.lock then
+            return nil
+        end
+        local length = header.length
+        if lock % 2 == 0 and length <= SHM_SIZE - SHM_HEADER_SIZE then
+            ffi.copy(shm.buffer, shm.packet, length)
+            if header.lock == lock then
+                shm.lock = lock
+                return ffi.string(shm.buffer, length)
+            end
+        end
+    end
+
+    return nil
+end
+
+---
+-- Take the newest position from the shared memory file, if the server wrote one since the last call
+function poll_shm_mouse()
+    local data = read_shm_packet()
+    if data == nil then
+        return
+    end
+
+    local sample = parse_socket_packet(data)
+    if sample and sample.x ~= nil then
+        local now = obs.os_gettime_ns()
+        socket_wire.shm.time = now
+        push_socket_sample(now / 1000, sample)
+        set_socket_mouse(sample)
+    end
+end
+
 function on_socket_timer()
     if not socket_server then
         return
     end
 
+    -- While a server on this machine writes into shared memory, packets are drained without using them;
+    -- the two streams have their own sequence numbers and would throw each other out
+    local shm = socket_wire.shm
+    local shm_active = shm ~= nil and shm.time ~= nil and obs.os_gettime_ns() - shm.time < SHM_ACTIVE_NS
+
+    -- Every valid sample goes into the ring buffer, the newest one is also kept for when there is no playout delay
+    local newest = nil
+    local has_reply = false
+    local arrival = obs.os_gettime_ns() / 1000
     repeat
-        local data, status = socket_server:receive_from()
+        local data, status = socket_server:receive_from(socket_wire.recv_address)
         if data then
-            local sx, sy = data:match("(-?%d+) (-?%d+)")
-            if sx and sy then
-                local x = tonumber(sx, 10)
-                local y = tonumber(sy, 10)
-                if not socket_mouse then
-                    log("Socket server client connected")
-                    socket_mouse = { x = x, y = y }
-                else
-                    socket_mouse.x = x
-                    socket_mouse.y = y
+            local sample = nil
+            if not shm_active then
+                sample = parse_socket_packet(data)
+            end
+            if sample then
+                if sample.x ~= nil then
+                    newest = sample
+                    push_socket_sample(arrival, sample)
+                end
+                if sample.binary then
+                    -- Remember who sent it, the receive buffer is reused by the next packet
+                    ffi.copy(socket_wire.reply_addr, socket_wire.recv_addr, ffi.sizeof(socket_wire.recv_addr))
+                    has_reply = true
                 end
             end
         elseif status ~= "timeout" then
             error(status)
         end
     until data == nil
+
+    if newest then
+        set_socket_mouse(newest)
+    end
+
+    if has_reply then
+        local now = obs.os_gettime_ns()
+        if socket_wire.ack_time == nil or now - socket_wire.ack_time >= 1000000000 then
+            socket_wire.ack_time = now
+            send_socket_ack()
+        end
+        if now - socket_wire.log_time >= 10000000000 then
+            socket_wire.log_time = now
+            log(string.format("Remote latency %.2fms, %d stale packets dropped", socket_wire.latency or 0, socket_wire.dropped))
+        end
+    end
 end
 
 function start_server()
+    socket_wire = { seq = nil, latency = nil, dropped = 0, received = 0, ack_time = nil, log_time = 0 }
+    socket_wire.count = 0
+    socket_wire.clock_offset = nil
+    socket_wire.ring_t = ffi.new("double[?]", SOCKET_RING_SIZE)
+    socket_wire.ring_x = ffi.new("double[?]", SOCKET_RING_SIZE)
+    socket_wire.ring_y = ffi.new("double[?]", SOCKET_RING_SIZE)
+
+    -- Shared memory needs no socket, the UDP listener below stays up for servers on other machines
+    if socket_shm ~= "" then
+        socket_wire.shm = { path = socket_shm, view = nil, lock = nil, time = nil, retry_time = 0 }
+        socket_wire.shm.buffer = ffi.new("uint8_t[?]", SHM_SIZE)
+        log("Looking for remote mouse positions in " .. socket_shm)
+    end
+
     if socket_available then
         local address = socket.find_first_address("*", socket_port)
 
         socket_server = socket.create("inet", "dgram", "udp")
+        -- Fixed address buffers, so the sender of a packet can still be answered after the receive loop
+        socket_wire.recv_addr = ffi.new("struct sockaddr_in[1]")
+        socket_wire.reply_addr = ffi.new("struct sockaddr_in[1]")
+        socket_wire.recv_address = {
+            addrinfo = { ai_addr = ffi.cast("struct sockaddr *", socket_wire.recv_addr), ai_addrlen = ffi.sizeof("struct sockaddr_in") }
+        }
+        socket_wire.reply_address = {
+            addrinfo = { ai_addr = ffi.cast("struct sockaddr *", socket_wire.reply_addr), ai_addrlen = ffi.sizeof("struct sockaddr_in") }
+        }
         if socket_server ~= nil then
             socket_server:set_option("reuseaddr", 1)
             socket_server:set_blocking(false)
@@ -1090,8 +1700,13 @@ function stop_server()
         obs.timer_remove(on_socket_timer)
         socket_server:close()
         socket_server = nil
-        socket_mouse = nil
     end
+    if socket_wire ~= nil and socket_wire.shm ~= nil and socket_wire.shm.view ~= nil then
+        unmap_shm_file(socket_wire.shm.view)
+    end
+    socket_mouse = nil
+    socket_crop = nil
+    socket_wire = nil
 end
 
 function set_crop_settings(crop)
@@ -1167,6 +1782,10 @@ function on_settings_modified(props, prop, settings)
         obs.obs_property_set_visible(obs.obs_properties_get(props, "socket_label"), not visible)
         obs.obs_property_set_visible(obs.obs_properties_get(props, "socket_port"), visible)
         obs.obs_property_set_visible(obs.obs_properties_get(props, "socket_poll"), visible)
+        obs.obs_property_set_visible(obs.obs_properties_get(props, "socket_sources"), visible)
+        obs.obs_property_set_visible(obs.obs_properties_get(props, "socket_playout"), visible)
+        obs.obs_property_set_visible(obs.obs_properties_get(props, "socket_slot"), visible)
+        obs.obs_property_set_visible(obs.obs_properties_get(props, "socket_shm"), visible)
         return true
     elseif name == "allow_all_sources" then
         local sources_list = obs.obs_properties_get(props, "source")
@@ -1205,6 +1824,10 @@ function log_current_settings()
         use_socket = use_socket,
         socket_port = socket_port,
         socket_poll = socket_poll,
+        socket_sources = socket_sources,
+        socket_playout = socket_playout,
+        socket_slot = socket_slot,
+        socket_shm = socket_shm,
         debug_logs = debug_logs,
         version = VERSION
     }
@@ -1245,7 +1868,11 @@ function on_print_help()
         help = help ..
             "Enable remote mouse listener: True to start a UDP socket server that will listen for mouse position messages from a remote client, see: https://github.com/BlankSourceCode/obs-zoom-to-mouse-remote\n" ..
             "Port: The port number to use for the socket server\n" ..
-            "Poll Delay: The time between updating the mouse position (in milliseconds)\n"
+            "Poll Delay: The time between updating the mouse position (in milliseconds)\n" ..
+            "Monitor Sources: Comma separated Zoom Sources for each remote monitor, used when the server follows the cursor across monitors\n" ..
+            "Playout Delay: Show the remote mouse this many milliseconds late, smoothly interpolated between the received positions (0 to use the newest position)\n" ..
+            "Remote Slot: Which slot of the server to follow, when one server drives several zoom sources with --slots\n" ..
+            "Shared Memory File: The file a server on this machine writes with --shm, read every frame instead of waiting for packets (empty to only listen on the port)\n"
     end
 
     help = help ..
@@ -1326,6 +1953,12 @@ function script_properties()
         local r_label = obs.obs_properties_add_text(socket_props, "socket_label", "", obs.OBS_TEXT_INFO)
         local r_port = obs.obs_properties_add_int(socket_props, "socket_port", "Port ", 1024, 65535, 1)
         local r_poll = obs.obs_properties_add_int(socket_props, "socket_poll", "Poll Delay (ms) ", 0, 1000, 1)
+        local r_sources = obs.obs_properties_add_text(socket_props, "socket_sources", "Monitor Sources ",
+            obs.OBS_TEXT_DEFAULT)
+        local r_playout = obs.obs_properties_add_int(socket_props, "socket_playout", "Playout Delay (ms) ", 0, 500, 1)
+        local r_slot = obs.obs_properties_add_int(socket_props, "socket_slot", "Remote Slot ", 0, 99, 1)
+        local r_shm = obs.obs_properties_add_path(socket_props, "socket_shm", "Shared Memory File ", obs.OBS_PATH_FILE,
+            "Shared memory (*.shm);;All files (*.*)", nil)
         local socket = obs.obs_properties_add_group(props, "use_socket", "Enable remote mouse listener ",
             obs.OBS_GROUP_CHECKABLE, socket_props)
 
@@ -1335,10 +1968,22 @@ function script_properties()
             "You must restart the server after changing the port (Uncheck then re-check 'Enable remote mouse listener')")
         obs.obs_property_set_long_description(r_poll,
             "You must restart the server after changing the poll delay (Uncheck then re-check 'Enable remote mouse listener')")
+        obs.obs_property_set_long_description(r_sources,
+            "Comma separated source names by monitor index (first one is monitor 0), the zoom source follows the remote cursor when the server runs with --setmonitor -1")
+        obs.obs_property_set_long_description(r_playout,
+            "Smooths out late or bunched packets by interpolating between them, about twice the poll delay plus the server tick works well (0 to use the newest position)")
+        obs.obs_property_set_long_description(r_slot,
+            "The slot this zoom source follows when the server runs with --slots (first slot is 0), use a copy of this script with its own port and slot for every zoom source")
+        obs.obs_property_set_long_description(r_shm,
+            "When the server runs on this machine with --shm, pick the file it prints at startup: positions are read every frame without the socket and poll delay. Packets on the port are still used when no server writes the file")
 
         obs.obs_property_set_visible(r_label, not use_socket)
         obs.obs_property_set_visible(r_port, use_socket)
         obs.obs_property_set_visible(r_poll, use_socket)
+        obs.obs_property_set_visible(r_sources, use_socket)
+        obs.obs_property_set_visible(r_playout, use_socket)
+        obs.obs_property_set_visible(r_slot, use_socket)
+        obs.obs_property_set_visible(r_shm, use_socket)
         obs.obs_property_set_modified_callback(socket, on_settings_modified)
     end
 
@@ -1428,6 +2073,11 @@ function script_load(settings)
     use_socket = obs.obs_data_get_bool(settings, "use_socket")
     socket_port = obs.obs_data_get_int(settings, "socket_port")
     socket_poll = obs.obs_data_get_int(settings, "socket_poll")
+    socket_sources = obs.obs_data_get_string(settings, "socket_sources")
+    socket_source_list = parse_socket_sources(socket_sources)
+    socket_playout = obs.obs_data_get_int(settings, "socket_playout")
+    socket_slot = obs.obs_data_get_int(settings, "socket_slot")
+    socket_shm = obs.obs_data_get_string(settings, "socket_shm")
     debug_logs = obs.obs_data_get_bool(settings, "debug_logs")
 
     obs.obs_frontend_add_event_callback(on_frontend_event)
@@ -1512,6 +2162,10 @@ function script_defaults(settings)
     obs.obs_data_set_default_bool(settings, "use_socket", false)
     obs.obs_data_set_default_int(settings, "socket_port", 12345)
     obs.obs_data_set_default_int(settings, "socket_poll", 10)
+    obs.obs_data_set_default_string(settings, "socket_sources", "")
+    obs.obs_data_set_default_int(settings, "socket_playout", 0)
+    obs.obs_data_set_default_int(settings, "socket_slot", 0)
+    obs.obs_data_set_default_string(settings, "socket_shm", "")
     obs.obs_data_set_default_bool(settings, "debug_logs", false)
 end
 
@@ -1556,6 +2210,8 @@ function script_update(settings)
     local old_socket = use_socket
     local old_port = socket_port
     local old_poll = socket_poll
+    local old_slot = socket_slot
+    local old_shm = socket_shm
 
     -- Update the settings
     source_name = obs.obs_data_get_string(settings, "source")
@@ -1580,6 +2236,11 @@ function script_update(settings)
     use_socket = obs.obs_data_get_bool(settings, "use_socket")
     socket_port = obs.obs_data_get_int(settings, "socket_port")
     socket_poll = obs.obs_data_get_int(settings, "socket_poll")
+    socket_sources = obs.obs_data_get_string(settings, "socket_sources")
+    socket_source_list = parse_socket_sources(socket_sources)
+    socket_playout = obs.obs_data_get_int(settings, "socket_playout")
+    socket_slot = obs.obs_data_get_int(settings, "socket_slot")
+    socket_shm = obs.obs_data_get_string(settings, "socket_shm")
     debug_logs = obs.obs_data_get_bool(settings, "debug_logs")
 
     -- Only do the expensive refresh if the user selected a new source
@@ -1609,9 +2270,12 @@ function script_update(settings)
         else
             stop_server()
         end
-    elseif use_socket and (old_poll ~= socket_poll or old_port ~= socket_port) then
+    elseif use_socket and (old_poll ~= socket_poll or old_port ~= socket_port or old_shm ~= socket_shm) then
         stop_server()
         start_server()
+    elseif socket_wire ~= nil and old_slot ~= socket_slot then
+        -- Don't interpolate between the positions of two slots
+        socket_wire.count = 0
     end
 end
 